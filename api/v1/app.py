@@ -2,13 +2,34 @@
 """Start a Flask API"""
 
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from models import storage
+from models.engine import json_codec
 from api.v1.views import app_views
 from os import getenv
 
 
+class CodecJSONProvider(DefaultJSONProvider):
+    """encodes and decodes the JSON of the API through json_codec"""
+
+    # keys are written in the order of the dictionaries
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        """returns obj encoded as JSON, with the standard library when
+        Flask asks for indented output"""
+        if kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+        return json_codec.dumps(obj)
+
+    def loads(self, s, **kwargs):
+        """returns the value decoded from the JSON s"""
+        return json_codec.loads(s)
+
+
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 app.register_blueprint(app_views)
 cors = CORS(app, resources={r"/*": {"origins": "0.0.0.0"}})
 
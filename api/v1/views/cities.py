@@ -11,7 +11,7 @@ from api.v1.views import app_views
         '/states/<state_id>/cities', methods=['GET'], strict_slashes=False)
 def get_cities(state_id):
     """Get list of all City objects of a State"""
-    state = storage.get(State, state_id)
+    state = storage.get(State, state_id, load=["cities"])
     if state is None:
         abort(404)
     cities = state.cities
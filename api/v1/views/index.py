@@ -2,7 +2,7 @@
 """index of views"""
 
 from api.v1.views import app_views
-from flask import jsonify
+from flask import abort, jsonify
 from models import storage
 from models.amenity import Amenity
 from models.city import City
@@ -10,6 +10,7 @@ from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
 
 
 @app_views.route('/status', methods=['GET'])
@@ -24,5 +25,22 @@ def stats():
     objs = {"amenities": Amenity, "cities": City, "places": Place,
             "reviews": Review, "states": State, "users": User}
 
-    stats = {key: storage.count(value) for key, value in objs.items()}
+    counts = getattr(storage, "counts", None)
+    if counts is not None:
+        # a single query for every class
+        by_name = counts(objs.values())
+        stats = {key: by_name[value.__name__] for key, value in objs.items()}
+    else:
+        stats = {key: storage.count(value) for key, value in objs.items()}
     return jsonify(stats)
+
+
+@app_views.route('/stats/pool', methods=['GET'])
+def pool_stats():
+    """Retrieves the statistics of the database connection pool, only
+    served with HBNB_API_POOL_STATS=1"""
+    if getenv("HBNB_API_POOL_STATS") != "1":
+        abort(404)
+    if not hasattr(storage, "pool_stats"):
+        abort(404)
+    return jsonify(storage.pool_stats())
@@ -14,7 +14,7 @@ from api.v1.views import app_views
         '/cities/<city_id>/places', methods=['GET'], strict_slashes=False)
 def get_places(city_id):
     """Get list of all Place objects of a City"""
-    city = storage.get(City, city_id)
+    city = storage.get(City, city_id, load=["places"])
     if city is None:
         abort(404)
     return jsonify([place.to_dict() for place in city.places])
@@ -89,38 +89,57 @@ def update_place(place_id):
 
 @app_views.route('/places_search', methods=['POST'], strict_slashes=False)
 def places_search():
-    """Search for Place objects based on JSON request body"""
+    """Search for Place objects based on JSON request body
+
+    The body may list "states", "cities" and "amenities" ids, and page the
+    results with "offset" and "limit". Each list must hold strings only.
+    """
     try:
         data = request.get_json()
     except Exception:
         data = None
-    if data is None:
+    if not isinstance(data, dict):
         abort(400, description="Not a JSON")
 
-    if not data:
-        places = storage.all("Place").values()
-        return jsonify([place.to_dict() for place in places])
-
-    states = data.get("states", [])
-    cities = data.get("cities", [])
-    amenities = data.get("amenities", [])
+    filters = []
+    for name in ("states", "cities", "amenities"):
+        ids = data.get(name) or []
+        if (not isinstance(ids, list) or
+                not all(isinstance(oid, str) for oid in ids)):
+            abort(400, description="Invalid filter")
+        filters.append(ids)
+    states, cities, amenities = filters
+    offset = data.get("offset", 0)
+    limit = data.get("limit")
+    if type(offset) is not int or offset < 0:
+        abort(400, description="offset must be a non-negative integer")
+    if limit is not None and (type(limit) is not int or limit < 0):
+        abort(400, description="limit must be a non-negative integer")
+
+    search = getattr(storage, "search_places", search_places)
+    places = search(states, cities, amenities, offset, limit)
+    return jsonify([place.to_dict() for place in places])
 
-    places = []
 
-    for state_id in states:
-        state = storage.get("State", state_id)
-        if state:
-            for city in state.cities:
+def search_places(states, cities, amenities, offset=0, limit=None):
+    """returns the places of a search the way DBStorage.search_places()
+    does, for the storages that cannot do it in SQL"""
+    if states or cities:
+        city_ids = set(cities)
+        for state_id in states:
+            state = storage.get(State, state_id)
+            if state is not None:
+                city_ids.update(city.id for city in state.cities)
+        places = []
+        for city_id in city_ids:
+            city = storage.get(City, city_id)
+            if city is not None:
                 places.extend(city.places)
-
-    for city_id in cities:
-        city = storage.get("City", city_id)
-        if city:
-            places.extend(city.places)
-
+    else:
+        places = storage.all(Place).values()
     if amenities:
-        places = [place for place in places if all(
-            amenity.id in [a.id for a in place.amenities]
-            for amenity in amenities)]
-
-    return jsonify([place.to_dict() for place in places])
+        wanted = set(amenities)
+        places = [place for place in places
+                  if wanted.issubset(place.amenity_ids)]
+    places = sorted(places, key=lambda place: (place.created_at, place.id))
+    return places[offset:None if limit is None else offset + limit]
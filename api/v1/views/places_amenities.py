@@ -1,18 +1,17 @@
 #!/usr/bin/python3
 """Link between Place and Amenity objects."""
 from flask import Flask, jsonify, request, abort
-from models import storage
+from models import storage, storage_t
 from models.place import Place
 from models.amenity import Amenity
 from api.v1.views import app_views
-from os import getenv
 
 
 @app_views.route('/places/<place_id>/amenities', methods=['GET'],
                  strict_slashes=False)
 def get_place_amenities(place_id):
     """Retrieves the list of all Amenity objects of a Place."""
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load=["amenities"])
     if not place:
         abort(404)
     return jsonify([amenity.to_dict()
@@ -23,14 +22,13 @@ def get_place_amenities(place_id):
                  methods=['DELETE'], strict_slashes=False)
 def delete_place_amenity(place_id, amenity_id):
     """Deletes a Amenity object from a Place."""
-    env = getenv('HBNB_TYPE_STORAGE')
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load=["amenities"])
     amenity = storage.get(Amenity, amenity_id)
     if not place:
         abort(404)
     if not amenity:
         abort(404)
-    if env == 'db':
+    if storage_t == 'db':
         if amenity not in place.amenities:
             abort(404)
         else:
@@ -39,7 +37,8 @@ def delete_place_amenity(place_id, amenity_id):
         if amenity.id not in place.amenity_ids:
             abort(404)
         else:
-            place.amenity_ids.remove(amenity.id)
+            place.amenity_ids = [amenity_id for amenity_id in place.amenity_ids
+                                 if amenity_id != amenity.id]
     storage.save()
     return jsonify({}), 200
 
@@ -48,14 +47,13 @@ def delete_place_amenity(place_id, amenity_id):
                  methods=['POST'], strict_slashes=False)
 def link_place_amenity(place_id, amenity_id):
     """Links a Amenity object to a Place."""
-    env = getenv('HBNB_TYPE_STORAGE')
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load=["amenities"])
     amenity = storage.get(Amenity, amenity_id)
     if not place:
         abort(404)
     if not amenity:
         abort(404)
-    if env == 'db':
+    if storage_t == 'db':
         if amenity in place.amenities:
             return jsonify(amenity.to_dict()), 200
         else:
@@ -63,6 +61,6 @@ def link_place_amenity(place_id, amenity_id):
     else:
         if amenity.id in place.amenity_ids:
             return jsonify(amenity.to_dict()), 200
-        place.amenity_ids.append(amenity.id)
+        place.amenity_ids = place.amenity_ids + [amenity.id]
     storage.save()
     return jsonify(amenity.to_dict()), 201
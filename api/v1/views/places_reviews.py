@@ -12,7 +12,7 @@ from api.v1.views import app_views
         '/places/<place_id>/reviews', methods=['GET'], strict_slashes=False)
 def get_reviews(place_id):
     """Retrieves the list of all Review objects of a Place"""
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load=["reviews"])
     if place is None:
         abort(404)
     reviews = place.reviews
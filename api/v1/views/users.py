@@ -4,6 +4,7 @@ from flask import Flask, jsonify, request, abort
 from models import storage
 from models.user import User
 from api.v1.views import app_views
+from sqlalchemy.exc import IntegrityError
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
@@ -28,7 +29,11 @@ def create_user():
         abort(400, description="Missing password")
     new_user = User(**data)
     storage.new(new_user)
-    storage.save()
+    try:
+        storage.save()
+    except IntegrityError:
+        # the email of another user, in a database
+        abort(400, description="Email already exists")
     return jsonify(new_user.to_dict()), 201
 
 
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Reports the size, save() time and reload() time of file.json for every
+compression method
+
+usage: ./benchmarks/bench_compression.py [number_of_objects]
+
+n States, Cities and Places are saved to a temporary directory with
+HBNB_FILE_COMPRESSION set to none, gzip and lzma in turn; each snapshot is
+then reloaded and every object built.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METHODS = ["none", "gzip", "lzma"]
+
+
+def main(n):
+    """times every compression method on n objects"""
+    sys.path.insert(0, ROOT)
+    from models import base_model, storage
+    from models.city import City
+    from models.engine.file_storage import FileStorage
+    from models.place import Place
+    from models.state import State
+
+    objs = []
+    for i in range(n // 3):
+        state = State(name="state {}".format(i))
+        city = City(name="city {}".format(i), state_id=state.id)
+        place = Place(name="place {}".format(i), city_id=city.id,
+                      user_id="user", number_rooms=i % 5,
+                      price_by_night=i % 300, latitude=37.7,
+                      longitude=-122.4, description="A lovely place " * 4)
+        objs += [state, city, place]
+    tmp = tempfile.TemporaryDirectory()
+    print("{:>6} {:>10} {:>10} {:>10}".format("method", "size MB",
+                                              "save s", "reload s"))
+    try:
+        for method in METHODS:
+            path = os.path.join(tmp.name, "file.json")
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__compression = method
+            FileStorage._FileStorage__objects = {}
+            base_model._dict_cache.clear()
+            base_model._json_cache.clear()
+            for obj in objs:
+                storage.new(obj)
+            start = time.perf_counter()
+            storage.save()
+            saved = time.perf_counter() - start
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            storage.reload()
+            storage.all()
+            reloaded = time.perf_counter() - start
+            print("{:>6} {:>10.1f} {:>10.2f} {:>10.2f}".format(
+                method, os.path.getsize(path) / 1e6, saved, reloaded))
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
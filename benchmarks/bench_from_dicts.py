@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Reports the per-object cost of building models from to_dict() output
+
+usage: ./benchmarks/bench_from_dicts.py [number_of_objects]
+
+Each class is built four ways from the same dictionaries:
+    before       cls(**d), timestamps parsed by strptime() as they were
+    __init__     cls(**d), timestamps parsed by parse_time()
+    from_dicts   cls.from_dicts(dicts)
+    trusted      cls.from_dicts(dicts, trusted=True)
+"""
+from datetime import datetime
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(n):
+    """times every way of building n objects of each class"""
+    sys.path.insert(0, ROOT)
+    from models import base_model
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+
+    def strptime(string):
+        """parses string the way BaseModel.__init__ used to"""
+        return datetime.strptime(string, base_model.time)
+    print("{:>6} {:>11} {:>15}".format("class", "way", "us per object"))
+    for cls in (State, Place, User):
+        dicts = [cls(name=str(i), email="e", password="p",
+                     city_id="c", user_id="u").to_dict() for i in range(n)]
+        ways = [("before", lambda: [cls(**d) for d in dicts]),
+                ("__init__", lambda: [cls(**d) for d in dicts]),
+                ("from_dicts", lambda: cls.from_dicts(dicts)),
+                # last, as it takes the dictionaries over
+                ("trusted", lambda: cls.from_dicts(dicts, trusted=True))]
+        for name, build in ways:
+            parse_time = base_model.parse_time
+            if name == "before":
+                base_model.parse_time = strptime
+            try:
+                start = time.perf_counter()
+                build()
+                elapsed = time.perf_counter() - start
+            finally:
+                base_model.parse_time = parse_time
+            print("{:>6} {:>11} {:>15.2f}".format(cls.__name__, name,
+                                                  elapsed / n * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
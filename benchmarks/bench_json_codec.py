@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Reports the time of save(), reload() and a listing of the API for every
+JSON codec installed
+
+usage: ./benchmarks/bench_json_codec.py [number_of_objects]
+
+n Users are stored in a temporary file.json, then for each codec:
+    save       FileStorage.save() of every User, nothing cached; the
+               new() calls marking them changed are not timed
+    reload     FileStorage.reload() followed by building every User
+    GET users  GET /api/v1/users through the Flask test client
+The first row, stdlib, is the baseline: the file saved with json.dump()
+and reloaded with json.load() and User(**d), as FileStorage used to, and
+the listing encoded by the default JSON provider of Flask.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(func):
+    """returns the seconds func() took"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n):
+    """times every codec on n Users"""
+    sys.path.insert(0, ROOT)
+    from api.v1.app import app
+    from flask.json.provider import DefaultJSONProvider
+    from models import base_model, storage
+    from models.engine import json_codec
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    tmp = tempfile.TemporaryDirectory()
+    FileStorage._FileStorage__file_path = os.path.join(tmp.name, "file.json")
+    FileStorage._FileStorage__objects = {}
+    users = [User(email="{}@hbnb.io".format(i), password="pwd",
+                  first_name="Betty", last_name="Holberton {}".format(i))
+             for i in range(n)]
+    client = app.test_client()
+
+    def changed():
+        """marks every User as changed, with nothing cached"""
+        base_model._dict_cache.clear()
+        base_model._json_cache.clear()
+        for user in users:
+            storage.new(user)
+
+    def reload():
+        """reloads file.json and builds every User"""
+        storage.reload()
+        storage.all(User)
+
+    def listing():
+        """lists the Users through the API"""
+        res = client.get('/api/v1/users')
+        assert res.status_code == 200 and len(res.get_json()) == n
+
+    stdlib_path = os.path.join(tmp.name, "stdlib.json")
+
+    def stdlib_save():
+        """saves every User with json.dump(), nothing cached"""
+        base_model._dict_cache.clear()
+        base_model._json_cache.clear()
+        with open(stdlib_path, 'w') as f:
+            json.dump({"User." + user.id: user.to_dict() for user in users},
+                      f)
+
+    def stdlib_reload():
+        """loads the file of stdlib_save() and builds every User"""
+        with open(stdlib_path, 'r') as f:
+            objects = json.load(f)
+        [User(**value) for value in objects.values()]
+
+    def stdlib_listing():
+        """lists the Users through the default JSON provider of Flask, with
+        nothing cached as after a reload"""
+        base_model._dict_cache.clear()
+        base_model._json_cache.clear()
+        provider = app.json
+        app.json = DefaultJSONProvider(app)
+        try:
+            listing()
+        finally:
+            app.json = provider
+
+    print("{:>8} {:>10} {:>10} {:>10}".format("codec", "save ms",
+                                              "reload ms", "GET ms"))
+    try:
+        changed()
+        storage.save()
+        times = [timed(stdlib_save), timed(stdlib_reload),
+                 timed(stdlib_listing)]
+        print("{:>8} {:>10.0f} {:>10.0f} {:>10.0f}".format(
+            "stdlib", *(t * 1e3 for t in times)))
+        for name in json_codec.available():
+            json_codec.use(name)
+            changed()
+            times = [timed(storage.save), timed(reload), timed(listing)]
+            print("{:>8} {:>10.0f} {:>10.0f} {:>10.0f}".format(
+                name, *(t * 1e3 for t in times)))
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
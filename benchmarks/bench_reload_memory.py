@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""Reports the peak RSS of FileStorage.reload() before and after streaming
+
+usage: ./benchmarks/bench_reload_memory.py [number_of_objects ...]
+
+For each size, a snapshot of States, Cities and Places is generated in a
+temporary directory, then loaded in a fresh process twice: once the way
+reload() used to do it (json.load of the whole file, then building the
+objects) and once through the streaming FileStorage.reload(), followed
+by building every object.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [100000, 1000000]
+STAMP = "2017-09-28T21:03:54.052298"
+
+
+def generate(path, n):
+    """writes a snapshot of n objects to path without holding it in RAM"""
+    sys.path.insert(0, ROOT)
+    from models.engine import json_stream
+
+    def entries():
+        """yields the snapshot entries one by one"""
+        for i in range(n):
+            name = ("State", "City", "Place")[i % 3]
+            oid = "{:08d}-0000-4000-8000-000000000000".format(i)
+            value = {"__class__": name, "id": oid, "name": "name {}".format(i),
+                     "created_at": STAMP, "updated_at": STAMP}
+            if name == "City":
+                value["state_id"] = "{:08d}-state".format(i - 1)
+            elif name == "Place":
+                value.update(city_id="{:08d}-city".format(i - 1),
+                             user_id="user", number_rooms=i % 5,
+                             price_by_night=i % 300, latitude=37.7,
+                             longitude=-122.4)
+            yield name + "." + oid, value
+    with open(path, "w") as f:
+        json_stream.dump(entries(), f)
+
+
+def child(mode, path):
+    """loads path in this process and prints the RSS figures as JSON"""
+    sys.path.insert(0, ROOT)
+    os.chdir(os.path.dirname(path))
+    from models.engine.file_storage import FileStorage, classes
+    from models import storage
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "before":
+        objects = {}
+        with open(path, "r") as f:
+            jo = json.load(f)
+        for key in jo:
+            objects[key] = classes[jo[key]["__class__"]](**jo[key])
+    else:
+        FileStorage._FileStorage__file_path = path
+        storage.reload()
+        # reload() is lazy: build every object like the old loader did
+        storage.all()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"base": base, "peak": peak, "seconds": elapsed}))
+
+
+def main(sizes):
+    """runs both loaders on every size and prints a table"""
+    print("{:>9} {:>7} {:>12} {:>12} {:>9}".format(
+        "objects", "mode", "peak RSS MB", "reload MB", "seconds"))
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snapshot.json")
+            generate(path, n)
+            for mode in ("before", "after"):
+                out = subprocess.run([sys.executable, __file__, "--child",
+                                      mode, path], check=True,
+                                     stdout=subprocess.PIPE).stdout
+                res = json.loads(out.decode().splitlines()[-1])
+                print("{:>9} {:>7} {:>12.1f} {:>12.1f} {:>9.2f}".format(
+                    n, mode, res["peak"] / 1024,
+                    (res["peak"] - res["base"]) / 1024, res["seconds"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
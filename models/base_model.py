@@ -6,13 +6,37 @@ Contains class BaseModel
 from datetime import datetime
 import sys
 import models
+from models.engine import json_codec
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
+import weakref
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# weak dictionaries - instance: its to_dict() and to_json(), until one of
+# its attributes is set
+_dict_cache = weakref.WeakKeyDictionary()
+_json_cache = weakref.WeakKeyDictionary()
+
+
+def parse_time(string):
+    """returns the datetime of an ISO 8601 timestamp such as to_dict() writes
+
+    fromisoformat() is used as it is much faster than strptime(), which is
+    only tried for the strings it rejects.
+    """
+    try:
+        return datetime.fromisoformat(string)
+    except ValueError:
+        return datetime.strptime(string, time)
+
+
+def format_time(dt):
+    """returns the timestamp of dt in the format of time"""
+    return dt.isoformat(timespec="microseconds")
+
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -20,6 +44,18 @@ else:
     Base = object
 
 
+def forget(obj, *args):
+    """drops the cached to_dict() and to_json() of obj"""
+    _dict_cache.pop(obj, None)
+    _json_cache.pop(obj, None)
+
+
+if models.storage_t == "db":
+    # SQLAlchemy also writes attributes without going through __setattr__
+    for name in ("refresh", "refresh_flush", "expire"):
+        sqlalchemy.event.listen(Base, name, forget, propagate=True)
+
+
 class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
@@ -34,11 +70,11 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
+                self.created_at = parse_time(kwargs["created_at"])
             else:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
+                self.updated_at = parse_time(kwargs["updated_at"])
             else:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
@@ -48,6 +84,38 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    @classmethod
+    def from_dicts(cls, dicts, trusted=False):
+        """returns a list of instances of cls built from the to_dict()
+        dictionaries of dicts
+
+        With trusted set, the dictionaries are taken as written by this
+        code, and taken over: each one becomes the __dict__ of its object,
+        without going through __init__ and its setattr() calls, once its
+        timestamps are parsed in place. Rows mapped by SQLAlchemy are
+        always built through __init__.
+        """
+        if not trusted or models.storage_t == "db":
+            return [cls(**value) for value in dicts]
+        objs = []
+        for value in dicts:
+            value.pop("__class__", None)
+            for name in ("created_at", "updated_at"):
+                if type(value.get(name)) is str:
+                    value[name] = parse_time(value[name])
+            obj = cls.__new__(cls)
+            object.__setattr__(obj, "__dict__", value)
+            objs.append(obj)
+        return objs
+
+    def __setattr__(self, name, value):
+        """sets an attribute and reports the change to the file storage"""
+        old = self.__dict__.get(name, getattr(type(self), name, None))
+        super().__setattr__(name, value)
+        forget(self)
+        if models.storage_t != "db":
+            models.storage.touch(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -60,18 +128,31 @@ class BaseModel:
         models.storage.save()
 
     def to_dict(self):
-        """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
-        new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
-        if "password" in new_dict:
-            del new_dict["password"]
-        return new_dict
+        """returns a dictionary containing all keys/values of the instance
+
+        It is built once and then copied until an attribute is set.
+        """
+        cached = _dict_cache.get(self)
+        if cached is None:
+            cached = self.__dict__.copy()
+            if "created_at" in cached:
+                cached["created_at"] = format_time(cached["created_at"])
+            if "updated_at" in cached:
+                cached["updated_at"] = format_time(cached["updated_at"])
+            cached["__class__"] = self.__class__.__name__
+            if "_sa_instance_state" in cached:
+                del cached["_sa_instance_state"]
+            if "password" in cached:
+                del cached["password"]
+            _dict_cache[self] = cached
+        return dict(cached)
+
+    def to_json(self):
+        """returns to_dict() encoded as JSON, cached the same way"""
+        text = _json_cache.get(self)
+        if text is None:
+            text = _json_cache[self] = json_codec.dumps(self.to_dict())
+        return text
 
     def delete(self):
         """delete the current instance from the storage"""
@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+"""Contains the binary snapshot format of the file storage
+
+A snapshot is laid out as:
+    header       magic, number of classes, number of strings and the
+                 offset of the string table
+    class table  per class: name, number of records and their offset
+    records      per class, each record being its number of attributes
+                 followed by (name, tag, payload) triplets
+    strings      offsets of every interned string, then their UTF-8 bytes
+
+Attribute names and string values are stored once in the string table
+and referenced by index. created_at and updated_at are stored as integer
+microseconds since the epoch, so reading them needs no strptime().
+
+usage: python3 -m models.engine.binary_snapshot export <snapshot> <json>
+       python3 -m models.engine.binary_snapshot import <json> <snapshot>
+"""
+from datetime import datetime, timedelta
+import json
+import mmap
+import struct
+import sys
+
+MAGIC = b"HBNBSNP1"
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMPS = ("created_at", "updated_at")
+
+_header = struct.Struct("<8sIIQ")
+_class = struct.Struct("<IIQ")
+_u8 = struct.Struct("<B")
+_u16 = struct.Struct("<H")
+_u32 = struct.Struct("<I")
+_i64 = struct.Struct("<q")
+_u64 = struct.Struct("<Q")
+_f64 = struct.Struct("<d")
+
+NONE, STR, INT, FLOAT, TRUE, FALSE, TIME, LIST, JSON = range(9)
+
+
+def is_snapshot(path):
+    """returns True if the file at path is a binary snapshot"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def write(f, entries):
+    """writes the (key, to_dict()) pairs of entries to the binary file f"""
+    strings = {}
+    sections = {}
+
+    def sid(string):
+        """returns the index of string in the string table"""
+        index = strings.get(string)
+        if index is None:
+            index = strings[string] = len(strings)
+        return index
+
+    def encode(buf, value):
+        """appends the tag and payload of value to buf"""
+        if value is None:
+            buf += _u8.pack(NONE)
+        elif value is True:
+            buf += _u8.pack(TRUE)
+        elif value is False:
+            buf += _u8.pack(FALSE)
+        elif isinstance(value, str):
+            buf += _u8.pack(STR) + _u32.pack(sid(value))
+        elif isinstance(value, int) and -(1 << 63) <= value < (1 << 63):
+            buf += _u8.pack(INT) + _i64.pack(value)
+        elif isinstance(value, float):
+            buf += _u8.pack(FLOAT) + _f64.pack(value)
+        elif isinstance(value, list):
+            buf += _u8.pack(LIST) + _u32.pack(len(value))
+            for item in value:
+                encode(buf, item)
+        else:
+            buf += _u8.pack(JSON) + _u32.pack(sid(json.dumps(value)))
+
+    for key, value in entries:
+        section = sections.setdefault(value["__class__"], [0, bytearray()])
+        buf = section[1]
+        buf += _u16.pack(len(value) - 1)
+        for name, attr in value.items():
+            if name == "__class__":
+                continue
+            buf += _u32.pack(sid(name))
+            if name in TIMESTAMPS and isinstance(attr, str):
+                try:
+                    delta = datetime.fromisoformat(attr) - EPOCH
+                except (TypeError, ValueError):
+                    encode(buf, attr)
+                    continue
+                micro = delta // timedelta(microseconds=1)
+                buf += _u8.pack(TIME) + _i64.pack(micro)
+            else:
+                encode(buf, attr)
+        section[0] += 1
+
+    names = [(sid(name), name) for name in sections]
+    offset = _header.size + _class.size * len(names)
+    table = bytearray()
+    for index, name in names:
+        table += _class.pack(index, sections[name][0], offset)
+        offset += len(sections[name][1])
+    f.write(_header.pack(MAGIC, len(names), len(strings), offset))
+    f.write(table)
+    for index, name in names:
+        f.write(sections[name][1])
+    blob = [string.encode() for string in strings]
+    position = 0
+    for data in blob:
+        f.write(_u64.pack(position))
+        position += len(data)
+    f.write(_u64.pack(position))
+    for data in blob:
+        f.write(data)
+
+
+class Snapshot:
+    """read-only view of a binary snapshot mapped into memory
+
+    Opening a snapshot only reads its header and class table; records and
+    strings are decoded when they are asked for.
+    """
+
+    def __init__(self, path):
+        """maps the snapshot at path and reads its class table"""
+        with open(path, 'rb') as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, nclasses, nstrings, offset = _header.unpack_from(self.__map)
+        if magic != MAGIC:
+            raise ValueError("{} is not a binary snapshot".format(path))
+        self.__offsets = offset
+        self.__blob = offset + _u64.size * (nstrings + 1)
+        self.__strings = [None] * nstrings
+        self.__classes = {}
+        for i in range(nclasses):
+            index, count, start = _class.unpack_from(
+                self.__map, _header.size + _class.size * i)
+            self.__classes[self.__string(index)] = (count, start)
+
+    def classes(self):
+        """returns the names of the classes stored in the snapshot"""
+        return list(self.__classes)
+
+    def count(self, name):
+        """returns the number of records of the class name"""
+        return self.__classes.get(name, (0, 0))[0]
+
+    def records(self, name):
+        """yields the attribute dictionary of every record of class name"""
+        count, pos = self.__classes.get(name, (0, 0))
+        m = self.__map
+        for _ in range(count):
+            nattrs, = _u16.unpack_from(m, pos)
+            pos += _u16.size
+            attrs = {}
+            for _ in range(nattrs):
+                index, = _u32.unpack_from(m, pos)
+                attrs[self.__string(index)], pos = self.__decode(pos +
+                                                                 _u32.size)
+            yield attrs
+
+    def close(self):
+        """unmaps the snapshot"""
+        self.__map.close()
+
+    def __string(self, index):
+        """returns the string at index of the string table"""
+        string = self.__strings[index]
+        if string is None:
+            start, end = struct.unpack_from(
+                "<QQ", self.__map, self.__offsets + _u64.size * index)
+            string = self.__map[self.__blob + start:
+                                self.__blob + end].decode()
+            self.__strings[index] = string
+        return string
+
+    def __decode(self, pos):
+        """returns the value at pos and the position that follows it"""
+        m = self.__map
+        tag = m[pos]
+        pos += 1
+        if tag == STR:
+            return self.__string(_u32.unpack_from(m, pos)[0]), pos + 4
+        if tag == INT:
+            return _i64.unpack_from(m, pos)[0], pos + 8
+        if tag == TIME:
+            micro = _i64.unpack_from(m, pos)[0]
+            return EPOCH + timedelta(microseconds=micro), pos + 8
+        if tag == FLOAT:
+            return _f64.unpack_from(m, pos)[0], pos + 8
+        if tag == NONE:
+            return None, pos
+        if tag == TRUE:
+            return True, pos
+        if tag == FALSE:
+            return False, pos
+        if tag == LIST:
+            count, = _u32.unpack_from(m, pos)
+            pos += 4
+            items = []
+            for _ in range(count):
+                item, pos = self.__decode(pos)
+                items.append(item)
+            return items, pos
+        text = self.__string(_u32.unpack_from(m, pos)[0])
+        return json.loads(text), pos + 4
+
+
+def to_json(src, dst):
+    """exports the binary snapshot src to the JSON file dst, compressed if
+    the extension of dst names a method"""
+    from models.engine import compression, json_stream
+    snap = Snapshot(src)
+
+    def entries():
+        """yields the records of src in the JSON file layout"""
+        for name in snap.classes():
+            for attrs in snap.records(name):
+                for attr in TIMESTAMPS:
+                    if isinstance(attrs.get(attr), datetime):
+                        attrs[attr] = attrs[attr].isoformat(
+                            timespec="microseconds")
+                attrs["__class__"] = name
+                yield name + "." + attrs["id"], attrs
+    try:
+        with open(dst, 'wb') as f:
+            with compression.writer(f, compression.method(dst)) as text:
+                json_stream.dump(entries(), text)
+    finally:
+        snap.close()
+
+
+def from_json(src, dst):
+    """imports the JSON file src, compressed or not, into the binary
+    snapshot dst"""
+    from models.engine import compression, json_stream
+    with compression.reader(src) as f, open(dst, 'wb') as out:
+        write(out, json_stream.iterload(f))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("export", "import"):
+        print(__doc__.split("usage: ")[1].strip())
+        sys.exit(1)
+    (to_json if sys.argv[1] == "export" else from_json)(*sys.argv[2:])
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Contains helpers to read and write the JSON storage files compressed
+
+Files are compressed with gzip or lzma while they are written, chunk by
+chunk, and decompressed the same way while they are read, so the
+uncompressed document is never held in memory. Reading recognizes the
+method from the first bytes of the file, whatever its name.
+"""
+from contextlib import contextmanager
+import gzip
+import io
+import lzma
+
+# dictionary - method: first bytes of the files it writes
+MAGIC = {"gzip": b"\x1f\x8b", "lzma": b"\xfd7zXZ\x00"}
+# dictionary - file extension: method it stands for
+EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".xz": "lzma", ".lzma": "lzma"}
+
+
+def method(path, setting=None):
+    """returns the method a file at path is written with, None for none
+
+    setting is "gzip", "lzma" or "none"; when it is empty the extension of
+    path decides.
+    """
+    if setting:
+        if setting == "none":
+            return None
+        if setting not in MAGIC:
+            raise ValueError("unknown compression {}".format(setting))
+        return setting
+    for extension, name in EXTENSIONS.items():
+        if path.endswith(extension):
+            return name
+    return None
+
+
+def detect(f):
+    """returns the method the binary file f is compressed with, or None,
+    leaving f at its start"""
+    head = f.read(max(len(magic) for magic in MAGIC.values()))
+    f.seek(0)
+    for name, magic in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+@contextmanager
+def reader(path):
+    """yields a text stream of the file at path, decompressed if needed"""
+    with open(path, 'rb') as f:
+        name = detect(f)
+        if name == "gzip":
+            stream = gzip.GzipFile(fileobj=f, mode='rb')
+        elif name == "lzma":
+            stream = lzma.LZMAFile(f, 'rb')
+        else:
+            stream = f
+        text = io.TextIOWrapper(stream, encoding="utf-8")
+        try:
+            yield text
+        finally:
+            text.detach()
+            if stream is not f:
+                stream.close()
+
+
+@contextmanager
+def writer(f, name=None, level=None):
+    """yields a text stream writing to the binary file f, compressed with
+    the method name at level if it is set
+
+    The default levels, 6 for gzip and 1 for lzma, trade some size for
+    saves several times faster than the maximum levels. f stays open, so
+    it can be fsynced once the stream is done.
+    """
+    if name == "gzip":
+        stream = gzip.GzipFile(fileobj=f, mode='wb', mtime=0,
+                               compresslevel=6 if level is None else level)
+    elif name == "lzma":
+        stream = lzma.LZMAFile(f, 'wb', preset=1 if level is None else level)
+    else:
+        stream = f
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        yield text
+        text.flush()
+    finally:
+        text.detach()
+        if stream is not f:
+            stream.close()
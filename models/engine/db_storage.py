@@ -4,6 +4,8 @@ import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine import migrations
+from models.engine.replicas import ReplicaRouter, RoutingSession
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -11,60 +13,273 @@ from models.user import User
 from os import getenv
 import sqlalchemy
 from sqlalchemy import create_engine
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.pool import QueuePool
+import threading
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# loading strategies the load argument of get() and all() can name
+loaders = {"selectin": sqlalchemy.orm.selectinload,
+           "joined": sqlalchemy.orm.joinedload,
+           "subquery": sqlalchemy.orm.subqueryload,
+           "lazy": sqlalchemy.orm.lazyload,
+           "raise": sqlalchemy.orm.raiseload}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        """creates the pool with its counters at zero"""
+        super().__init__(*args, **kwargs)
+        self.__stats_lock = threading.Lock()
+        self.__checkouts = 0
+        self.__timeouts = 0
+        self.__wait_time = 0.0
+        self.__max_wait = 0.0
+
+    def _do_get(self):
+        """returns a connection of the pool, timing the wait for it"""
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            with self.__stats_lock:
+                self.__checkouts += 1
+                self.__timeouts += timed_out
+                self.__wait_time += wait
+                self.__max_wait = max(self.__max_wait, wait)
+
+    def stats(self):
+        """returns the checkout counters and the occupancy of the pool"""
+        with self.__stats_lock:
+            return {"size": self.size(),
+                    "checked_in": self.checkedin(),
+                    "checked_out": self.checkedout(),
+                    "overflow": max(self.overflow(), 0),
+                    "checkouts": self.__checkouts,
+                    "timeouts": self.__timeouts,
+                    "wait_time": self.__wait_time,
+                    "max_wait": self.__max_wait}
 
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # boolean - make lazy loads the query did not plan for raise errors
+    __raiseload = getenv('HBNB_RAISELOAD') == "1"
 
     def __init__(self):
         """Instantiate a DBStorage object"""
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__engine = self.make_engine()
+        self.__router = None
+        urls = self.replica_urls()
+        if urls:
+            interval = float(getenv('HBNB_REPLICA_CHECK_INTERVAL', 5))
+            self.__router = ReplicaRouter(
+                [self.make_replica(url) for url in urls], interval)
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+
+    def make_engine(self):
+        """returns the engine of the MySQL database"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
+        return create_engine('mysql+mysqldb://{}:{}@{}/{}'.
+                             format(HBNB_MYSQL_USER,
+                                    HBNB_MYSQL_PWD,
+                                    HBNB_MYSQL_HOST,
+                                    HBNB_MYSQL_DB),
+                             **self.pool_options())
+
+    def replica_urls(self):
+        """returns the URLs of the read replicas, a comma separated list in
+        HBNB_MYSQL_REPLICAS"""
+        urls = getenv('HBNB_MYSQL_REPLICAS', "")
+        return [url.strip() for url in urls.split(",") if url.strip()]
+
+    def make_replica(self, url):
+        """returns the engine of the read replica at url"""
+        return create_engine(url, **self.pool_options())
+
+    @staticmethod
+    def pool_options():
+        """returns the connection pool settings of create_engine()
+
+        HBNB_MYSQL_POOL_SIZE       connections kept open (default: 5)
+        HBNB_MYSQL_MAX_OVERFLOW    extra connections under load (10)
+        HBNB_MYSQL_POOL_TIMEOUT    seconds to wait for a connection (30)
+        HBNB_MYSQL_POOL_RECYCLE    seconds before a connection is replaced,
+                                   below the MySQL wait_timeout (3600)
+        HBNB_MYSQL_POOL_PRE_PING   1 to test connections on checkout (1)
+        """
+        return {"poolclass": TimedQueuePool,
+                "pool_size": int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+                "max_overflow": int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+                "pool_timeout": float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+                "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+                "pool_pre_ping": getenv('HBNB_MYSQL_POOL_PRE_PING',
+                                        "1") == "1"}
+
+    def pool_stats(self):
+        """returns the live statistics of the connection pool"""
+        pool = self.__engine.pool
+        stats = {"pool": type(pool).__name__}
+        if isinstance(pool, TimedQueuePool):
+            stats.update(pool.stats())
+        if self.__router is not None:
+            stats["replicas"] = self.__router.status()
+        return stats
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, load=None):
+        """query on the current database session
+
+        The objects of every class are read in a single UNION ALL query.
+        With cls, load names the relationships to load with them, as for
+        get().
+        """
+        if cls is None:
+            return self.__all_classes()
         new_dict = {}
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+            if cls is classes[clss] or cls is clss:
+                query = self.__session.query(classes[clss])
+                objs = query.options(*self.__options(classes[clss],
+                                                     load)).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def stream(self, cls=None, yield_per=1000):
+        """yields the (key, object) pairs of cls, or of every class, the
+        rows being fetched yield_per at a time instead of all at once"""
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                query = self.__session.query(classes[clss])
+                for obj in query.yield_per(yield_per):
+                    yield obj.__class__.__name__ + '.' + obj.id, obj
+
+    def search_places(self, states=(), cities=(), amenities=(), offset=0,
+                      limit=None):
+        """returns the places in the states or the cities given, or all of
+        them if neither is, that have every amenity of amenities
+
+        Everything is compiled into one query; the places come out once
+        each, ordered by creation, from offset and at most limit of them.
+        """
+        query = self.__session.query(Place)
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                sqlalchemy.or_(City.state_id.in_(states),
+                               City.id.in_(cities)))
+        if amenities:
+            place_amenity = Base.metadata.tables["place_amenity"]
+            wanted = set(amenities)
+            having = sqlalchemy.select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(wanted)).group_by(
+                place_amenity.c.place_id).having(sqlalchemy.func.count(
+                    place_amenity.c.amenity_id.distinct()) == len(wanted))
+            query = query.filter(Place.id.in_(having))
+        query = query.order_by(Place.created_at, Place.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def __all_classes(self):
+        """returns the objects of every class read in one query, reusing
+        those already in the session"""
+        session = self.__session
+        if session.autoflush:
+            session.flush()
+        new_dict = {}
+        for row in session.execute(self.__union()).mappings():
+            mapper = sqlalchemy.inspect(classes[row["__class__"]])
+            identity = mapper.identity_key_from_primary_key([row["id"]])
+            obj = session.identity_map.get(identity)
+            if obj is None:
+                obj = mapper.class_manager.new_instance()
+                for attr in mapper.column_attrs:
+                    set_committed_value(obj, attr.key,
+                                        row[attr.columns[0].name])
+                make_transient_to_detached(obj)
+                session.add(obj)
+            new_dict[row["__class__"] + '.' + obj.id] = obj
+        return new_dict
+
+    @staticmethod
+    def __union():
+        """returns a UNION ALL of the rows of every table, tagged with the
+        name of their class and padded with NULLs to the same columns"""
+        types = {}
+        for cls in classes.values():
+            for column in cls.__table__.columns:
+                types.setdefault(column.name, column.type)
+        selects = []
+        for name, cls in classes.items():
+            columns = cls.__table__.columns
+            selects.append(sqlalchemy.select(
+                sqlalchemy.literal(name).label("__class__"),
+                *[(columns[column] if column in columns else
+                   sqlalchemy.literal(None, type_)).label(column)
+                  for column, type_ in types.items()]))
+        return sqlalchemy.union_all(*selects)
+
     def new(self, obj):
         """add the object to the current database session"""
+        self.__pin()
         self.__session.add(obj)
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """commit all changes of the current database session, rolling it
+        back if the commit fails"""
+        self.__pin()
+        try:
+            self.__session.commit()
+        except sqlalchemy.exc.SQLAlchemyError:
+            self.__session.rollback()
+            raise
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
+            self.__pin()
             self.__session.delete(obj)
 
+    def __pin(self):
+        """makes the current session read from the primary database from
+        now on, so that it sees its own writes"""
+        if self.__router is not None:
+            self.__session().pin()
+
     def reload(self):
-        """reloads data from the database"""
+        """reloads data from the database, creating the missing tables and
+        migrating the existing ones"""
+        migrations.skip_foreign_key_indexes(Base.metadata.tables)
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        migrations.migrate(self.__engine, Base.metadata.tables)
+        if self.__router is not None:
+            # reads go to the replicas until the session writes
+            sess_factory = sessionmaker(bind=self.__engine,
+                                        class_=RoutingSession,
+                                        router=self.__router,
+                                        expire_on_commit=False)
+        else:
+            sess_factory = sessionmaker(bind=self.__engine,
+                                        expire_on_commit=False)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -72,18 +287,71 @@ class DBStorage:
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
-        """Returns the object based on the class and its ID"""
+    def get(self, cls, id, load=None):
+        """Returns the object based on the class and its ID
+
+        load lists the relationships to load with the object, as paths
+        like "places" or "places.reviews" loaded with selectinload, or
+        maps such paths to a strategy of loaders:
+            storage.get(State, state_id, load={"cities": "joined"})
+        """
         if cls not in classes.values():
             return None
-        obj = self.__session.query(cls).filter(cls.id == id).first()
+        query = self.__session.query(cls).options(*self.__options(cls, load))
+        obj = query.filter(cls.id == id).first()
         return obj
 
+    def __options(self, cls, load):
+        """returns the loader options of a query on cls for load
+
+        With HBNB_RAISELOAD=1, every relationship left out of load raises
+        an error when it is accessed instead of being lazy loaded.
+        """
+        if isinstance(load, dict):
+            paths = load.items()
+        else:
+            paths = [(path, "selectin") for path in load or ()]
+        options = []
+        for path, strategy in paths:
+            option = None
+            entity = cls
+            for name in path.split("."):
+                attr = getattr(entity, name)
+                if option is None:
+                    option = loaders[strategy](attr)
+                else:
+                    option = getattr(option, loaders[strategy].__name__)(
+                        attr)
+                entity = attr.property.mapper.class_
+            options.append(option)
+            if self.__raiseload:
+                options.append(option.raiseload("*"))
+        if self.__raiseload:
+            options.append(sqlalchemy.orm.raiseload("*"))
+        return options
+
     def count(self, cls=None):
         """Returns the number of objects in storage matching the given class"""
         if cls is None:
-            return sum(self.__session.query(
-                cls).count() for cls in classes.values())
+            return sum(self.counts().values())
         elif cls in classes.values():
             return self.__session.query(cls).count()
         return 0
+
+    def counts(self, clss=None):
+        """returns the number of objects of each class of clss, or of every
+        class, by class name, counted in a single query"""
+        names = [cls if isinstance(cls, str) else cls.__name__
+                 for cls in (classes if clss is None else clss)]
+        session = self.__session
+        if session.autoflush:
+            session.flush()
+        selects = [sqlalchemy.select(sqlalchemy.literal(name).label("name"),
+                                     sqlalchemy.func.count().label("count"))
+                   .select_from(classes[name])
+                   for name in names if name in classes]
+        counts = dict.fromkeys(names, 0)
+        if selects:
+            rows = session.execute(sqlalchemy.union_all(*selects))
+            counts.update({name: count for name, count in rows})
+        return counts
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+"""Contains the DBMStorage class
+
+Every object is stored as the JSON of its to_dict() under the key
+<class name>.id of a dbm database, next to the records of its indexes:
+    #count.<class name>                    number of objects of the class
+    #ref.<class name>.<foreign key>.<value> JSON list of the ids of the
+                                           objects with that foreign key
+"""
+from collections import OrderedDict
+import dbm
+import threading
+import weakref
+from models.engine import json_codec
+from models.engine.file_storage import classes, foreign_keys
+from os import getenv
+
+
+class DBMStorage:
+    """stores instances in an on-disk dbm hash, keeping in memory only a
+    bounded cache of them and the changes not saved yet"""
+
+    # string - path of the dbm database
+    __path = getenv("HBNB_DBM_PATH", "hbnb.dbm")
+    # integer - number of clean objects the cache keeps alive
+    __cache_size = int(getenv("HBNB_DBM_CACHE_SIZE", 1024))
+
+    def __init__(self):
+        """Instantiate a DBMStorage object"""
+        self.__db = None
+        # ordered dictionary - key: clean object, least recently used first
+        self.__cache = OrderedDict()
+        # dictionary - key: every object built from the database still alive
+        self.__live = weakref.WeakValueDictionary()
+        # dictionary - key: object changed since the last save, None if
+        # deleted
+        self.__dirty = {}
+        self.__lock = threading.RLock()
+
+    def all(self, cls=None, load=None):
+        """returns a dictionary of the objects of cls, or of every class
+
+        The keys of the database are scanned for the class prefix; only
+        the objects found are built. load is accepted for DBStorage
+        compatibility.
+        """
+        names = classes if cls is None else [self.__name(cls)]
+        new_dict = {}
+        with self.__lock:
+            prefixes = tuple((name + ".").encode() for name in names)
+            keys = [key.decode() for key in self.__db.keys()
+                    if key.startswith(prefixes)]
+            keys += [key for key in self.__dirty
+                     if key.split('.', 1)[0] in names]
+            for key in keys:
+                obj = self.__lookup(key)
+                if obj is not None:
+                    new_dict[key] = obj
+        return new_dict
+
+    def new(self, obj):
+        """adds obj to the changes of the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock:
+                self.__dirty[key] = obj
+
+    def touch(self, obj, name=None, old=None):
+        """marks obj as changed if it is the instance stored under its key;
+        name and old, the attribute set and its former value, are unused"""
+        oid = obj.__dict__.get("id")
+        if oid is not None:
+            key = obj.__class__.__name__ + "." + oid
+            with self.__lock:
+                if (self.__dirty.get(key) is not obj and
+                        self.__live.get(key) is obj):
+                    self.__dirty[key] = obj
+
+    def related(self, cls, attr, value):
+        """returns the objects of cls whose foreign key attr equals value"""
+        name = self.__name(cls)
+        with self.__lock:
+            ref = "#ref.{}.{}.{}".format(name, attr, value)
+            ids = json_codec.loads(self.__db.get(ref, b"[]"))
+            keys = [name + "." + oid for oid in ids]
+            keys += [key for key, obj in self.__dirty.items()
+                     if key.split('.', 1)[0] == name and obj is not None and
+                     getattr(obj, attr, None) == value and key not in keys]
+            objs = []
+            for key in keys:
+                obj = self.__lookup(key)
+                if obj is not None and getattr(obj, attr, None) == value:
+                    objs.append(obj)
+        return objs
+
+    def save(self):
+        """writes the changes and their index updates to the database"""
+        with self.__lock:
+            for key, obj in self.__dirty.items():
+                self.__write(key, obj)
+            sync = getattr(self.__db, "sync", None)
+            if sync is not None:
+                sync()
+            for key, obj in self.__dirty.items():
+                if obj is not None:
+                    self.__cache_put(key, obj)
+            self.__dirty = {}
+
+    def delete(self, obj=None):
+        """adds the deletion of obj to the changes of the next save"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock:
+                self.__cache.pop(key, None)
+                self.__live.pop(key, None)
+                self.__dirty[key] = None
+
+    def reload(self):
+        """opens the database, dropping the cache and unsaved changes"""
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+            self.__db = dbm.open(self.__path, 'c')
+            self.__cache.clear()
+            self.__live = weakref.WeakValueDictionary()
+            self.__dirty = {}
+
+    def close(self):
+        """nothing to refresh: every read goes through the database"""
+
+    def get(self, cls, id, load=None):
+        """Returns the object based on the class and its ID"""
+        if cls is not None:
+            with self.__lock:
+                return self.__lookup(self.__name(cls) + "." + id)
+
+    def count(self, cls=None):
+        """Returns the number of objects in storage matching the given class"""
+        names = classes if cls is None else [self.__name(cls)]
+        total = 0
+        with self.__lock:
+            for name in names:
+                total += int(self.__db.get("#count." + name, b"0"))
+            for key, obj in self.__dirty.items():
+                if key.split('.', 1)[0] in names:
+                    total += (obj is not None) - (key in self.__db)
+        return total
+
+    @staticmethod
+    def __name(cls):
+        """returns the class name of cls, which may already be a name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __lookup(self, key):
+        """returns the object stored under key, built from the database
+        only if no instance of it is in memory"""
+        if key in self.__dirty:
+            return self.__dirty[key]
+        obj = self.__cache.get(key)
+        if obj is not None:
+            self.__cache.move_to_end(key)
+            return obj
+        obj = self.__live.get(key)
+        if obj is None:
+            data = self.__db.get(key)
+            if data is None:
+                return None
+            value = json_codec.loads(data)
+            obj = classes[value["__class__"]].from_dicts([value], True)[0]
+        self.__cache_put(key, obj)
+        return obj
+
+    def __cache_put(self, key, obj):
+        """makes obj the most recently used object of the cache"""
+        self.__live[key] = obj
+        self.__cache[key] = obj
+        self.__cache.move_to_end(key)
+        while len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+
+    def __write(self, key, obj):
+        """writes obj, or its deletion if None, under key and updates the
+        count and foreign key indexes of its class"""
+        db = self.__db
+        name, oid = key.split('.', 1)
+        data = db.get(key)
+        old = json_codec.loads(data) if data is not None else None
+        new = obj.to_dict() if obj is not None else None
+        for attr in foreign_keys.get(name, ()):
+            was = old.get(attr) if old is not None else None
+            now = new.get(attr) if new is not None else None
+            if was != now:
+                self.__unref(name, attr, was, oid)
+                self.__ref(name, attr, now, oid)
+        if (old is None) != (new is None):
+            count = int(db.get("#count." + name, b"0"))
+            db["#count." + name] = str(count + (1 if old is None else -1))
+        if new is not None:
+            db[key] = json_codec.dumps(new)
+        elif old is not None:
+            del db[key]
+
+    def __ref(self, name, attr, value, oid):
+        """adds oid to the index of attr of class name under value"""
+        if value is not None:
+            ref = "#ref.{}.{}.{}".format(name, attr, value)
+            ids = json_codec.loads(self.__db.get(ref, b"[]"))
+            if oid not in ids:
+                ids.append(oid)
+                self.__db[ref] = json_codec.dumps(ids)
+
+    def __unref(self, name, attr, value, oid):
+        """removes oid from the index of attr of class name under value"""
+        if value is not None:
+            ref = "#ref.{}.{}.{}".format(name, attr, value)
+            ids = json_codec.loads(self.__db.get(ref, b"[]"))
+            if oid in ids:
+                ids.remove(oid)
+                if ids:
+                    self.__db[ref] = json_codec.dumps(ids)
+                else:
+                    del self.__db[ref]
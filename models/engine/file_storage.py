@@ -1,16 +1,28 @@
 #!/usr/bin/python3
 """Contains the FileStorage class"""
-import json
+import atexit
+import fcntl
+import functools
+import os
+import shutil
+import tempfile
+import threading
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine import binary_snapshot, compression, json_codec
+from models.engine import json_stream, place_columns
+from models.engine.rwlock import ReadWriteLock
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
 
 
 class FileStorage:
@@ -20,73 +32,946 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by <class name>
+    __classes = {}
+    # dictionary - <class name>: {key: dictionary read from the files for
+    # an object not built yet}
+    __raw = {}
+    # dictionary - (<class name>, foreign key): {value: key of the only
+    # object holding it, or {key: None} of those holding it in order}
+    __refs = {}
+    # PlaceColumns - numeric attributes of the places in columns, or None
+    __columns = (place_columns.PlaceColumns()
+                 if getenv("HBNB_PLACE_COLUMNS") == "1" else None)
+    # dictionary - the __objects dictionary the indexes were built from
+    __indexed = None
+    # string - format save() writes, "json" or "binary"
+    __format = getenv("HBNB_FILE_FORMAT", "json")
+    # string - compression of the JSON files, "gzip", "lzma" or "none",
+    # taken from the extension of __file_path if empty
+    __compression = getenv("HBNB_FILE_COMPRESSION", "")
+    # integer - compression level, or None for the default of the method
+    __compression_level = (int(getenv("HBNB_FILE_COMPRESSION_LEVEL"))
+                           if getenv("HBNB_FILE_COMPRESSION_LEVEL") else None)
+    # boolean - keep one file per class instead of a single snapshot
+    __sharded = getenv("HBNB_FILE_SHARDED") == "1"
+    # dictionary - <class name>: callable yielding its not yet built objects
+    __pending = {}
+    # dictionary - <class name>: number of records of a pending class in
+    # the binary snapshot
+    __pending_counts = {}
+    # boolean - several processes share the storage files
+    __multiprocess = getenv("HBNB_FILE_MULTIPROCESS") == "1"
+    # boolean - append changed keys to a journal instead of rewriting
+    __journal = getenv("HBNB_FILE_JOURNAL",
+                       "1" if __multiprocess else "0") == "1"
+    # integers - journal size and entry count that trigger a compaction
+    __journal_max_bytes = int(getenv("HBNB_JOURNAL_MAX_BYTES", 1 << 20))
+    __journal_max_entries = int(getenv("HBNB_JOURNAL_MAX_ENTRIES", 10000))
+    # integer - entries appended to the active journal so far
+    __journal_entries = 0
+    # integer - bytes of the active journal already applied to __objects
+    __journal_offset = 0
+    # tuple - stat of the snapshot and journals when last read or written
+    __stamp = None
+    # set - keys created, updated or deleted since the last save
+    __dirty = set()
+    # thread - folds the sealed journal into a new snapshot
+    __compactor = None
+    # lock - shared by readers, exclusive while objects, indexes or files
+    # are being changed
+    __lock = ReadWriteLock()
+    # string - "strict" or "relaxed" to leave the writes to a flusher thread
+    __write_behind = getenv("HBNB_FILE_WRITE_BEHIND")
+    # number and integer - seconds between flushes, dirty keys forcing one
+    __flush_interval = int(getenv("HBNB_FLUSH_INTERVAL_MS", 100)) / 1000
+    __flush_max_dirty = int(getenv("HBNB_FLUSH_MAX_DIRTY", 1000))
+    # condition - signals new save requests and finished flushes
+    __flush_cond = threading.Condition()
+    # integers - save() calls so far and how many of them are on disk
+    __requested = 0
+    __flushed = 0
+    # integer and exception - last save() a failed flush covered, its error
+    __failed = 0
+    __flush_error = None
+    # boolean - a save() is writing on behalf of the others
+    __committing = False
+    # thread - writes the saves requested in write-behind mode
+    __flusher = None
+    # integer, string and integer - descriptor of the lock file, its path
+    # and the process it was opened in
+    __lock_fd = None
+    __lock_path = None
+    __lock_pid = None
+    # integer - generation counter of the storage files last seen or written
+    __generation = 0
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, load=None):
+        """returns a copy of the dictionary __objects, or of the objects of
+        class cls, which is safe to iterate while other threads change the
+        storage
+
+        load is accepted for DBStorage compatibility: relationships are
+        read from the indexes, never loaded.
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+            name = self.__name(cls)
+            self.__prepare(name)
+            with self.__lock.read():
+                unbuilt = bool(self.__raw.get(name))
+            if unbuilt:
+                self.__build(name)
+            with self.__lock.read():
+                return dict(self.__classes.get(name, {}))
+        self.__prepare()
+        with self.__lock.read():
+            unbuilt = any(self.__raw.values())
+        if unbuilt:
+            self.__build()
+        with self.__lock.read():
+            return dict(self.__objects)
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.write():
+                self.__put(key, obj)
+                self.__dirty.add(key)
+
+    def touch(self, obj, name=None, old=None):
+        """marks obj as changed if it is the instance stored under its key,
+        old being the value its attribute name held before"""
+        oid = obj.__dict__.get("id")
+        if oid is not None:
+            key = obj.__class__.__name__ + "." + oid
+            if self.__objects.get(key) is obj:
+                with self.__lock.write():
+                    self.__dirty.add(key)
+                    cls_name = obj.__class__.__name__
+                    indexed = foreign_keys.get(cls_name, ())
+                    if self.__columns is not None and cls_name == "Place":
+                        indexed += place_columns.COLUMNS
+                    if name in indexed:
+                        self.__index()
+                        self.__unlink(key, {name: old})
+                        self.__link(key, obj)
+
+    def related(self, cls, attr, value):
+        """returns the objects of cls whose foreign key attr equals value"""
+        name = self.__name(cls)
+        self.__prepare(name)
+        with self.__lock.read():
+            keys = self.__keys(self.__refs.get((name, attr), {}).get(value))
+            keys = [key for key in keys if key not in self.__objects]
+        if keys:
+            # only the objects asked for are built
+            self.__build(name, keys)
+        with self.__lock.read():
+            keys = self.__keys(self.__refs.get((name, attr), {}).get(value))
+            objs = [self.__objects.get(key) for key in keys]
+            return [obj for obj in objs if obj is not None]
+
+    @staticmethod
+    def __keys(bucket):
+        """returns the keys of a bucket of the foreign key indexes"""
+        if bucket is None:
+            return ()
+        return (bucket,) if isinstance(bucket, str) else tuple(bucket)
+
+    def place_ids(self, **ranges):
+        """returns the ids of the places whose numeric attributes fall in
+        the (min, max) ranges given by keyword, None leaving a bound open
+
+        The ranges are evaluated over the columns of HBNB_PLACE_COLUMNS=1,
+        or else over columns built for this call.
+        """
+        self.__prepare("Place")
+        with self.__lock.read():
+            columns = self.__columns
+            if columns is None:
+                columns = place_columns.PlaceColumns()
+                for key, obj in self.__classes.get("Place", {}).items():
+                    columns.set(obj.id, self.__getter(key, obj))
+                for key, value in self.__raw.get("Place", {}).items():
+                    columns.set(value["id"], self.__getter(key, None, value))
+            return columns.select(**ranges)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
+
+        In write-behind mode the write is left to the flusher thread; a
+        strict save() still returns only once its changes are on disk, and
+        raises the error of the write if it failed.
+        """
+        if self.__write_behind in ("strict", "relaxed"):
+            self.__schedule()
+        else:
+            self.__commit()
+
+    def __commit(self):
+        """writes the changes, sharing one write and fsync with the saves
+        that arrive while another save is writing (group commit)"""
+        with self.__flush_cond:
+            FileStorage.__requested += 1
+            target = self.__requested
+            while self.__flushed < target:
+                if not self.__committing:
+                    break
+                self.__flush_cond.wait()
+            else:
+                # a write that started after our changes covered them
+                return
+            FileStorage.__committing = True
+        try:
+            with self.__lock.write():
+                # every save requested by now has its changes in memory
+                with self.__flush_cond:
+                    batch = self.__requested
+                self.__write()
+        except BaseException:
+            with self.__flush_cond:
+                FileStorage.__committing = False
+                self.__flush_cond.notify_all()
+            raise
+        with self.__flush_cond:
+            FileStorage.__committing = False
+            FileStorage.__flushed = max(self.__flushed, batch)
+            self.__flush_cond.notify_all()
+
+    def __write(self):
+        """writes the changes; when several processes share the files, it
+        merges theirs first and holds the file lock while writing"""
+        if not self.__multiprocess:
+            self.__flush()
+            return
+        fd = self.__lock_file()
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            self.__catch_up()
+            self.__flush()
+            # the files must be complete before the lock is released
+            self.__wait_compactor()
+            FileStorage.__generation += 1
+            os.pwrite(fd, self.__generation.to_bytes(8, "little"), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __flush(self):
+        """writes the changes to the snapshot or the journal"""
+        if self.__journal and self.__has_snapshot():
+            self.__append_journal()
+            return
+        self.__wait_compactor()
+        names = None
+        if self.__sharded and not os.path.isfile(self.__file_path):
+            # only the shards of classes with changes are rewritten
+            names = {key.split('.', 1)[0] for key in self.__dirty}
+            for name in names:
+                self.__load(name)
+        elif self.__pending:
+            self.__load()
+        self.__write_snapshot(self.__index(), self.__raw, names)
+        self.__dirty.clear()
+        # the full snapshot supersedes any journal left on disk
+        for path in self.__journal_paths():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        FileStorage.__journal_entries = 0
+        FileStorage.__journal_offset = 0
+        FileStorage.__stamp = self.__fingerprint()
 
     def reload(self):
         """deserializes the JSON file to __objects"""
+        with self.__lock.write():
+            if not self.__multiprocess:
+                self.__reload()
+                return
+            fd = self.__lock_file()
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            try:
+                FileStorage.__generation = self.__disk_generation()
+                self.__reload()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __reload(self):
+        """deserializes the snapshot and its journal to __objects
+
+        Keys changed since the last save keep their in-memory version. A
+        missing or empty snapshot loads nothing; a corrupt one raises
+        ValueError rather than being silently replaced by the next save.
+        """
+        self.__wait_compactor()
+        # stat before reading so a concurrent write shows up on next close()
+        FileStorage.__stamp = self.__fingerprint()
+        FileStorage.__pending = {}
+        FileStorage.__pending_counts = {}
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            if self.__sharded and not os.path.isfile(self.__file_path):
+                # each shard is read when its class is first accessed
+                for name in classes:
+                    path = self.__shard_path(name)
+                    if os.path.isfile(path):
+                        self.__pending[name] = functools.partial(
+                            self.__shard, path, name)
+            elif binary_snapshot.is_snapshot(self.__file_path):
+                # objects are built when their class is first accessed
+                snap = binary_snapshot.Snapshot(self.__file_path)
+                for name in snap.classes():
+                    self.__pending[name] = functools.partial(
+                        self.__records, snap, name)
+                    self.__pending_counts[name] = snap.count(name)
+            elif os.path.getsize(self.__file_path) == 0:
+                # an empty file holds no objects yet
+                return
+            else:
+                with compression.reader(self.__file_path) as f:
+                    for key, value in json_stream.iterload(f):
+                        if key not in self.__dirty:
+                            self.__put_raw(key, value)
+            sealed, active = self.__journal_paths()
+            self.__replay(sealed)
+            FileStorage.__journal_entries, FileStorage.__journal_offset = \
+                self.__replay(active)
 
         except FileNotFoundError:
             pass
-        except json.JSONDecodeError:
-            pass
-        except Exception as e:
-            print("An unexpected error occurred: {}".format(e))
+        except ValueError as e:
+            # saving over a corrupt file would lose what it still holds
+            raise ValueError("cannot read the storage files of {}, left "
+                             "untouched: {}".format(self.__file_path,
+                                                    e)) from e
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock.write():
+                if self.__pending:
+                    self.__load(obj.__class__.__name__)
+                if self.__drop(key) is not None:
+                    self.__dirty.add(key)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """reloads the storage files only if another writer changed them"""
+        if self.__multiprocess:
+            if self.__disk_generation() == self.__generation:
+                return
+            with self.__lock.write():
+                fd = self.__lock_file()
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                try:
+                    self.__catch_up()
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            return
+        if self.__fingerprint() != self.__stamp:
+            with self.__lock.write():
+                self.__catch_up()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None):
         """Returns the object based on the class and its ID"""
         if cls is not None:
-            key = cls.__name__ + '.' + id
-            if key in self.__objects:
-                return self.__objects[key]
-            return None
+            name = self.__name(cls)
+            key = name + '.' + id
+            with self.__lock.read():
+                pending = bool(self.__pending)
+            if pending:
+                self.__load(name)
+            with self.__lock.read():
+                unbuilt = key in self.__raw.get(name, ())
+            if unbuilt:
+                self.__build(name, [key])
+            with self.__lock.read():
+                return self.__objects.get(key)
 
     def count(self, cls=None):
-        """Returns the number of objects in storage matching the given class"""
-        if cls is not None:
-            count = 0
-            for obj in self.__objects:
-                if obj.split('.')[0] == cls.__name__:
-                    count += 1
-            return count
+        """Returns the number of objects in storage matching the given class
+
+        A class still pending in a binary snapshot is counted from the class
+        table of the snapshot, without being built, while none of its
+        objects is in memory.
+        """
+        if self.__stale():
+            with self.__lock.write():
+                self.__index()
+        total = 0
+        for name in classes if cls is None else [self.__name(cls)]:
+            with self.__lock.read():
+                pending = self.__pending_counts.get(name)
+                if (pending is not None and not self.__classes.get(name) and
+                        not self.__raw.get(name)):
+                    total += pending
+                    continue
+            self.__prepare(name)
+            with self.__lock.read():
+                total += (len(self.__classes.get(name, ())) +
+                          len(self.__raw.get(name, ())))
+        return total
+
+    @staticmethod
+    def __name(cls):
+        """returns the class name of cls, which may already be a name"""
+        return cls if isinstance(cls, str) else cls.__name__
 
+    def __prepare(self, name=None):
+        """builds what reading class name, or every class, needs under the
+        read lock: its pending objects and indexes gone stale"""
+        with self.__lock.read():
+            pending = bool(self.__pending)
+        if pending:
+            self.__load(name)
+        if self.__stale():
+            with self.__lock.write():
+                self.__index()
+
+    def __stale(self):
+        """returns True if __objects was replaced or edited directly"""
+        with self.__lock.read():
+            objects = self.__objects
+            return (objects is not self.__indexed or
+                    len(objects) != sum(map(len, self.__classes.values())))
+
+    def __index(self):
+        """returns __classes, rebuilt if __objects was replaced or edited
+
+        The foreign key indexes are rebuilt along with the partitions. Raw
+        dictionaries read for a replaced __objects are dropped with it.
+        """
+        objects = self.__objects
+        if self.__stale():
+            if objects is not self.__indexed:
+                FileStorage.__raw = {}
+            FileStorage.__classes = {}
+            FileStorage.__refs = {}
+            if self.__columns is not None:
+                self.__columns.clear()
+            for key, obj in objects.items():
+                self.__classes.setdefault(obj.__class__.__name__,
+                                          {})[key] = obj
+                self.__link(key, obj)
+            for raw in self.__raw.values():
+                for key, value in raw.items():
+                    self.__link(key, None, value)
+            FileStorage.__indexed = objects
+        return self.__classes
+
+    @staticmethod
+    def __getter(key, obj, raw=None):
+        """returns a function giving the attributes of obj, or those of the
+        raw dictionary of an object not built yet if obj is None"""
+        if obj is not None:
+            return lambda attr: getattr(obj, attr, None)
+        cls = classes[key.split('.', 1)[0]]
+        return lambda attr: raw.get(attr, getattr(cls, attr, None))
+
+    def __link(self, key, obj, raw=None):
+        """adds obj to the indexes of the foreign keys of its class, or
+        the raw dictionary of an object not built yet if obj is None
+
+        Places are also stored in the columns of HBNB_PLACE_COLUMNS=1.
+        """
+        name, oid = key.split('.', 1)
+        attrs = foreign_keys.get(name)
+        if self.__columns is not None and name == "Place":
+            self.__columns.set(oid, self.__getter(key, obj, raw))
+        if attrs:
+            get = self.__getter(key, obj, raw)
+            values = tuple(get(attr) for attr in attrs)
+            for attr, value in zip(attrs, values):
+                refs = self.__refs.setdefault((name, attr), {})
+                bucket = refs.get(value)
+                if bucket is None:
+                    # most values are held by one object: no dictionary
+                    refs[value] = key
+                elif isinstance(bucket, str):
+                    refs[value] = {bucket: None, key: None}
+                else:
+                    bucket[key] = None
+
+    def __unlink(self, key, old=None):
+        """removes key from the indexes of the foreign keys of its class
+
+        The values it is indexed under are read from the object or raw
+        dictionary stored under key, or from old for the attributes just
+        set on the object.
+        """
+        name = key.split('.', 1)[0]
+        attrs = foreign_keys.get(name)
+        if not attrs:
+            return
+        obj = self.__objects.get(key)
+        raw = None if obj is not None else self.__raw.get(name, {}).get(key)
+        if obj is None and raw is None:
+            return
+        get = self.__getter(key, obj, raw)
+        for attr in attrs:
+            value = old[attr] if old and attr in old else get(attr)
+            refs = self.__refs.get((name, attr), {})
+            bucket = refs.get(value)
+            if bucket is None:
+                continue
+            if isinstance(bucket, str):
+                if bucket == key:
+                    del refs[value]
+                continue
+            bucket.pop(key, None)
+            if len(bucket) == 1:
+                refs[value] = next(iter(bucket))
+
+    def __catch_up(self):
+        """applies what other writers changed in the storage files: only
+        the changed keys when possible, otherwise through a full reload"""
+        if self.__multiprocess:
+            FileStorage.__generation = self.__disk_generation()
+        stamp = self.__fingerprint()
+        old = self.__stamp
+        if stamp == old:
+            return
+        if (old is None or stamp[:2] != old[:2] or
+                not self.__refresh(stamp, old)):
+            # the files win: keys another writer deleted must not survive
+            self.__discard_clean()
+            self.__reload()
+
+    def __discard_clean(self, name=None):
+        """drops every object and raw dictionary of class name, or of every
+        class, not changed since the last save, along with its indexes"""
+        parts = self.__index()
+        names = set(parts) | set(self.__raw) if name is None else [name]
+        keys = []
+        for name in names:
+            keys += [key for key in parts.get(name, ())
+                     if key not in self.__dirty]
+            keys += [key for key in self.__raw.get(name, ())
+                     if key not in self.__dirty]
+        for key in keys:
+            self.__drop(key)
+
+    def __lock_file(self):
+        """returns the descriptor of the lock file of the storage files,
+        opened once per process since forked children must not share it
+
+        The file also holds the generation counter, bumped by every write.
+        """
+        path = self.__file_path + ".lock"
+        if self.__lock_pid != os.getpid() or self.__lock_path != path:
+            if self.__lock_pid == os.getpid():
+                os.close(self.__lock_fd)
+            FileStorage.__lock_fd = os.open(path, os.O_RDWR | os.O_CREAT,
+                                            0o644)
+            FileStorage.__lock_path = path
+            FileStorage.__lock_pid = os.getpid()
+        return self.__lock_fd
+
+    def __disk_generation(self):
+        """returns the generation counter stored in the lock file"""
+        data = os.pread(self.__lock_file(), 8, 0)
+        return int.from_bytes(data, "little") if len(data) == 8 else 0
+
+    def __refresh(self, stamp, old):
+        """applies the changes between the stamps old and stamp without a
+        full reload, returns False if only a full reload can apply them"""
+        offset = self.__journal_offset if old[2] is not None else 0
+        if stamp[2] != old[2] and (stamp[2] is None or (
+                old[2] is not None and (stamp[2][0] != old[2][0] or
+                                        stamp[2][1] < offset))):
+            return False
+        FileStorage.__stamp = stamp
+        if stamp[0] is None:
+            # shards rewritten by another writer are read again on access
+            for name, new, was in zip(classes, stamp[3], old[3]):
+                if new is not None and new != was:
+                    # the shard wins: keys it no longer holds must go
+                    self.__discard_clean(name)
+                    self.__pending[name] = functools.partial(
+                        self.__shard, self.__shard_path(name), name)
+        if stamp[2] != old[2]:
+            # the active journal was appended to: apply only its tail
+            entries, FileStorage.__journal_offset = self.__replay(
+                self.__journal_paths()[1], offset)
+            FileStorage.__journal_entries += entries
+        return True
+
+    def __load(self, name=None):
+        """builds the objects of class name, or of every class, that are
+        still pending in a binary snapshot or a shard"""
+        with self.__lock.write():
+            names = list(self.__pending) if name is None else [name]
+            for name in names:
+                source = self.__pending.pop(name, None)
+                self.__pending_counts.pop(name, None)
+                if source is None:
+                    continue
+                try:
+                    for key, obj in source():
+                        # changes made since the reload win over the file
+                        if key in self.__dirty:
+                            continue
+                        if isinstance(obj, dict):
+                            self.__put_raw(key, obj)
+                        else:
+                            self.__put(key, obj)
+                except FileNotFoundError:
+                    pass
+
+    def __records(self, snap, name):
+        """yields the (key, obj) pairs of class name in a binary snapshot"""
+        for obj in classes[name].from_dicts(snap.records(name), True):
+            yield name + "." + obj.id, obj
+
+    def __shard(self, path, name):
+        """yields the (key, obj) pairs stored in the shard of class name,
+        with the raw dictionary in place of obj in a JSON shard"""
+        if binary_snapshot.is_snapshot(path):
+            yield from self.__records(binary_snapshot.Snapshot(path), name)
         else:
-            return len(self.__objects)
+            with compression.reader(path) as f:
+                yield from json_stream.iterload(f)
+
+    def __shard_path(self, name):
+        """returns the path of the shard holding the objects of class name"""
+        return self.__file_path + "." + name
+
+    def __has_snapshot(self):
+        """returns True if a snapshot or a shard exists on disk"""
+        if os.path.isfile(self.__file_path):
+            return True
+        return self.__sharded and any(os.path.isfile(self.__shard_path(name))
+                                      for name in classes)
+
+    def __write_snapshot(self, parts, raw, names=None):
+        """writes the class partitions parts, and the raw dictionaries of
+        raw as they were read, to the snapshot
+
+        In sharded mode every class goes to its own shard and only the
+        classes in names are written, or all of them if names is None.
+        Whichever layout is written, files of the other one are removed.
+        """
+        if self.__sharded:
+            for name in classes if names is None else names:
+                self.__write_file(self.__shard_path(name), parts, raw,
+                                  [name])
+            stale = [self.__file_path] if names is None else []
+        else:
+            self.__write_file(self.__file_path, parts, raw, classes)
+            stale = [self.__shard_path(name) for name in classes]
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.__sync_dir()
+
+    @staticmethod
+    def __entries(parts, raw, names, encoded=False):
+        """yields the (key, dictionary) pairs of the classes names, taken
+        from to_dict() of the objects of parts and as is from raw
+
+        With encoded set, the dictionaries are yielded as JSON text, the
+        cached to_json() of the objects being reused, as are the texts
+        raw may hold in place of dictionaries.
+        """
+        for name in names:
+            for key, obj in parts.get(name, {}).items():
+                yield key, obj.to_json() if encoded else obj.to_dict()
+            if encoded:
+                for key, value in raw.get(name, {}).items():
+                    if not isinstance(value, str):
+                        value = json_codec.dumps(value)
+                    yield key, value
+            else:
+                yield from raw.get(name, {}).items()
+
+    def __write_file(self, path, parts, raw, names):
+        """writes the objects of parts and raw of the classes names to path
+        in the format set by HBNB_FILE_FORMAT, compressed as set by
+        HBNB_FILE_COMPRESSION if it is JSON
+
+        The data goes to a temporary file that is fsynced and then renamed
+        over path, so a crash leaves either the old or the new file.
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix=name + ".", suffix=".tmp",
+                                   dir=directory)
+        try:
+            try:
+                os.chmod(tmp, os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                os.chmod(tmp, 0o644)
+            if self.__format == "binary":
+                with os.fdopen(fd, 'wb') as f:
+                    binary_snapshot.write(f, self.__entries(parts, raw,
+                                                            names))
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                method = compression.method(self.__file_path,
+                                            self.__compression)
+                with os.fdopen(fd, 'wb') as f:
+                    with compression.writer(f, method,
+                                            self.__compression_level) as text:
+                        json_stream.dump(self.__entries(parts, raw, names,
+                                                        True),
+                                         text, encoded=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+            # a mapped snapshot must be replaced, never rewritten in place
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def __sync_dir(self):
+        """fsyncs the directory of the storage files so renames persist"""
+        fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                     os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __put(self, key, obj):
+        """stores obj under key in __objects and in its class partition"""
+        parts = self.__index()
+        self.__unlink(key)
+        self.__raw.get(obj.__class__.__name__, {}).pop(key, None)
+        self.__objects[key] = obj
+        parts.setdefault(obj.__class__.__name__, {})[key] = obj
+        self.__link(key, obj)
+
+    def __put_raw(self, key, value):
+        """stores the dictionary value read from the files under key
+
+        The object is built only when it is first asked for, unless an
+        instance of it was built already: that one is replaced at once.
+        """
+        self.__index()
+        if key in self.__objects:
+            cls = classes[value["__class__"]]
+            self.__put(key, cls.from_dicts([value], True)[0])
+            return
+        self.__unlink(key)
+        self.__raw.setdefault(value["__class__"], {})[key] = value
+        self.__link(key, None, value)
+
+    def __build(self, name=None, keys=None):
+        """builds the objects of the raw dictionaries of class name, or of
+        every class, or only those stored under keys
+
+        Each raw dictionary becomes the __dict__ of its object and leaves
+        __raw as soon as the object is stored.
+        """
+        with self.__lock.write():
+            self.__index()
+            for name in list(self.__raw) if name is None else [name]:
+                raw = self.__raw.get(name, {})
+                found = [key for key in (raw if keys is None else keys)
+                         if key in raw]
+                from_dicts = classes[name].from_dicts
+                for key in found:
+                    self.__put(key, from_dicts([raw[key]], True)[0])
+
+    def __drop(self, key):
+        """removes key from __objects and its class partition, or its raw
+        dictionary if it was not built"""
+        parts = self.__index()
+        self.__unlink(key)
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            parts[obj.__class__.__name__].pop(key, None)
+        else:
+            obj = self.__raw.get(key.split('.', 1)[0], {}).pop(key, None)
+        if self.__columns is not None and key.startswith("Place."):
+            self.__columns.remove(key.split('.', 1)[1])
+        return obj
+
+    def __journal_paths(self):
+        """returns the paths of the sealed and the active journal"""
+        active = self.__file_path + ".journal"
+        return active + ".1", active
+
+    def __append_journal(self):
+        """appends one JSON line per dirty key to the active journal"""
+        if not self.__dirty:
+            return
+        lines = []
+        for key in self.__dirty:
+            obj = self.__objects.get(key)
+            value = obj.to_json() if obj is not None else "null"
+            lines.append("{" + json_codec.dumps(key) + ": " + value + "}\n")
+        active = self.__journal_paths()[1]
+        created = not os.path.exists(active)
+        with open(active, 'a', encoding="utf-8") as f:
+            f.write("".join(lines))
+            size = f.tell()
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            self.__sync_dir()
+        self.__dirty.clear()
+        FileStorage.__journal_entries += len(lines)
+        FileStorage.__journal_offset = size
+        FileStorage.__stamp = self.__fingerprint()
+        if (size >= self.__journal_max_bytes or
+                self.__journal_entries >= self.__journal_max_entries):
+            self.__compact()
+
+    def __replay(self, path, offset=0):
+        """applies the journal at path from offset to __objects
+
+        Returns the number of entries applied and the offset reached.
+        """
+        entries = 0
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # a torn final line from an unfinished append
+                        break
+                    entry = json_codec.loads(line)
+                    for key, value in entry.items():
+                        if self.__pending:
+                            self.__load(key.split('.', 1)[0])
+                        if key in self.__dirty:
+                            continue
+                        if value is None:
+                            self.__drop(key)
+                        else:
+                            self.__put_raw(key, value)
+                    entries += 1
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return entries, offset
+
+    def __compact(self):
+        """seals the active journal and folds it in a background thread"""
+        sealed, active = self.__journal_paths()
+        if self.__compactor is not None and self.__compactor.is_alive():
+            # the previous compaction has not been folded in yet
+            return
+        if os.path.exists(sealed):
+            # a fold failed: the sealed journal takes in the active one and
+            # both are folded into the next snapshot
+            with open(active, 'rb') as f, open(sealed, 'ab') as out:
+                shutil.copyfileobj(f, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.remove(active)
+        else:
+            os.replace(active, sealed)
+        FileStorage.__journal_entries = 0
+        FileStorage.__journal_offset = 0
+        FileStorage.__stamp = self.__fingerprint()
+        if self.__pending:
+            self.__load()
+        # every change is in the journal now: the objects are serialized
+        # under the lock, before later changes not saved yet reach them
+        binary = self.__format == "binary"
+        frozen = {}
+        for name, part in self.__index().items():
+            frozen[name] = {key: obj.to_dict() if binary else obj.to_json()
+                            for key, obj in part.items()}
+        for name, part in self.__raw.items():
+            frozen.setdefault(name, {}).update(
+                (key, dict(value)) for key, value in part.items())
+        FileStorage.__compactor = threading.Thread(target=self.__fold,
+                                                   args=(frozen,))
+        self.__compactor.start()
+
+    def __fold(self, frozen):
+        """writes the dictionaries or JSON texts of frozen as the new
+        snapshot, then drops the sealed journal"""
+        self.__write_snapshot({}, frozen)
+        os.remove(self.__journal_paths()[0])
+        stamp, fresh = self.__stamp, self.__fingerprint()
+        if stamp is not None:
+            FileStorage.__stamp = fresh[:2] + stamp[2:3] + fresh[3:]
+
+    @staticmethod
+    def __stat(path):
+        """returns the inode, size and mtime of path, or None"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def __fingerprint(self):
+        """returns the stats of the snapshot, sealed and active journal,
+        followed by the tuple of the stats of the shards"""
+        sealed, active = self.__journal_paths()
+        shards = ()
+        if self.__sharded:
+            shards = tuple(self.__stat(self.__shard_path(name))
+                           for name in classes)
+        return (self.__stat(self.__file_path), self.__stat(sealed),
+                self.__stat(active), shards)
+
+    def __schedule(self):
+        """requests a flush, waiting for it in strict write-behind mode"""
+        with self.__flush_cond:
+            FileStorage.__requested += 1
+            target = self.__requested
+            if self.__flusher is None:
+                FileStorage.__flusher = threading.Thread(
+                    target=self.__flush_loop, daemon=True)
+                self.__flusher.start()
+                atexit.register(self.__final_flush)
+            self.__flush_cond.notify_all()
+            if self.__write_behind == "strict":
+                self.__flush_cond.wait_for(
+                    lambda: max(self.__flushed, self.__failed) >= target)
+                if self.__flushed < target:
+                    raise self.__flush_error
+
+    def __flush_loop(self):
+        """flushes the requested saves at most once per flush interval,
+        or as soon as enough keys are dirty"""
+        while True:
+            with self.__flush_cond:
+                # a failed flush is retried by the next save() only
+                self.__flush_cond.wait_for(
+                    lambda: self.__requested > max(self.__flushed,
+                                                   self.__failed))
+                self.__flush_cond.wait_for(
+                    lambda: len(self.__dirty) >= self.__flush_max_dirty,
+                    self.__flush_interval)
+                target = self.__requested
+            error = None
+            try:
+                with self.__lock.write():
+                    self.__write()
+            except Exception as e:
+                error = e
+            with self.__flush_cond:
+                if error is None:
+                    FileStorage.__flushed = max(self.__flushed, target)
+                else:
+                    FileStorage.__failed = target
+                    FileStorage.__flush_error = error
+                self.__flush_cond.notify_all()
+
+    def __final_flush(self):
+        """writes the saves still waiting for the flusher at exit"""
+        with self.__flush_cond:
+            target = self.__requested
+        if target > self.__flushed:
+            with self.__lock.write():
+                self.__write()
+            with self.__flush_cond:
+                FileStorage.__flushed = max(self.__flushed, target)
+                self.__flush_cond.notify_all()
+
+    def __wait_compactor(self):
+        """blocks until a running compaction has finished"""
+        if self.__compactor is not None:
+            self.__compactor.join()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""Contains the JSON codec shared by the storage engines and the API
+
+The fastest encoder installed is used: msgspec, then orjson, then ujson,
+then the standard library. HBNB_JSON_CODEC names one of them to force it.
+Every codec encodes datetimes as ISO 8601 strings and raises ValueError
+on invalid input. orjson decodes integers beyond 64 bits as floats, so
+the texts that may hold one are decoded by the standard library; msgspec
+needs no such check and is preferred to orjson, though just as fast.
+"""
+from datetime import datetime
+import importlib
+import json
+from os import getenv
+import re
+
+CODECS = ("msgspec", "orjson", "ujson", "json")
+# patterns - 19 digits in a row, as in any integer beyond 64 bits
+LONG_DIGITS = re.compile(r"\d{19}")
+LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+# string - name of the codec in use
+name = None
+
+
+def default(value):
+    """returns the JSON encodable form of value, for the encoders that do
+    not know its type"""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="microseconds")
+    raise TypeError("{} is not JSON serializable".format(
+        type(value).__name__))
+
+
+def available():
+    """returns the names of the codecs that can be imported"""
+    names = []
+    for codec in CODECS:
+        try:
+            importlib.import_module(codec)
+        except ImportError:
+            continue
+        names.append(codec)
+    return names
+
+
+def use(codec=None):
+    """makes codec the one dumps() and loads() go through, or the fastest
+    one installed if codec is None"""
+    global name, dumps, loads
+    for candidate in CODECS if codec is None else (codec,):
+        if candidate not in CODECS:
+            raise ValueError("unknown JSON codec {}".format(candidate))
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if codec is not None:
+                raise
+            continue
+        break
+    if candidate == "orjson":
+        def dumps(value):
+            """returns value encoded as a JSON string"""
+            try:
+                return module.dumps(value).decode()
+            except TypeError:
+                # integers beyond 64 bits
+                return json.dumps(value, default=default)
+
+        def loads(text):
+            """returns the value decoded from the JSON text"""
+            if isinstance(text, str):
+                long_digits = LONG_DIGITS.search(text)
+            else:
+                long_digits = LONG_DIGITS_BYTES.search(text)
+            if long_digits:
+                # possibly an integer orjson would turn into a float
+                return json.loads(text)
+            return module.loads(text)
+    elif candidate == "msgspec":
+        encoder = module.json.Encoder(enc_hook=default)
+        decoder = module.json.Decoder()
+
+        def dumps(value):
+            """returns value encoded as a JSON string"""
+            return encoder.encode(value).decode()
+
+        def loads(text):
+            """returns the value decoded from the JSON text"""
+            try:
+                return decoder.decode(text)
+            except module.DecodeError as e:
+                raise ValueError(str(e)) from None
+    elif candidate == "ujson":
+        def dumps(value):
+            """returns value encoded as a JSON string"""
+            return module.dumps(value, ensure_ascii=False,
+                                escape_forward_slashes=False,
+                                default=default)
+        loads = module.loads
+    else:
+        def dumps(value):
+            """returns value encoded as a JSON string"""
+            return json.dumps(value, default=default)
+        loads = json.loads
+    name = candidate
+
+
+use(getenv("HBNB_JSON_CODEC") or None)
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""Contains helpers to read and write the JSON storage file entry by entry"""
+import io
+import itertools
+import json
+from models.engine import json_codec
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+
+
+def iterload(f, chunk_size=1 << 16):
+    """yields the (key, value) pairs of the JSON object read from f
+
+    Only the current chunk and the entry being decoded are held in memory,
+    so the whole document is never parsed into one dictionary. A document
+    laid out the way dump() writes it, one entry per line, is decoded line
+    by line through json_codec.
+    """
+    head = f.read(chunk_size)
+    if head.startswith("{\n"):
+        pieces = head[2:].split("\n")
+        last = pieces.pop() + f.readline()
+        lines = [piece + "\n" for piece in pieces]
+        yield from _lines(itertools.chain(lines, [last], f), chunk_size)
+    else:
+        yield from _scan(f, head, chunk_size)
+
+
+def _lines(lines, chunk_size):
+    """yields the (key, value) pairs of lines, the rest of a document
+    after its opening brace
+
+    Lines are joined until they decode as whole entries; what is left when
+    they never do is handed to _scan().
+    """
+    text = ""
+    for line in lines:
+        text += line
+        body = text.strip()
+        if body == "}":
+            return
+        if body.endswith(","):
+            body = body[:-1]
+        try:
+            entries = json_codec.loads("{" + body + "}")
+        except ValueError:
+            continue
+        yield from entries.items()
+        text = ""
+    yield from _scan(io.StringIO(), "{" + text, chunk_size)
+
+
+def _scan(f, buf, chunk_size):
+    """yields the (key, value) pairs of the JSON object starting in buf
+    and read on from f"""
+    pos = 0
+    eof = False
+
+    def token():
+        """returns the next non-whitespace character, reading as needed"""
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos] in _whitespace:
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            read()
+
+    def read():
+        """appends the next chunk of f to buf, dropping what was consumed"""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def decode():
+        """decodes the JSON value starting at pos"""
+        nonlocal pos
+        token()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # a value ending the buffer may continue in the next chunk
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            read()
+
+    def expect(char):
+        """consumes char or raises a decoding error"""
+        nonlocal pos
+        if token() != char:
+            raise json.JSONDecodeError("Expecting '{}'".format(char),
+                                       buf, pos)
+        pos += 1
+
+    expect("{")
+    if token() == "}":
+        return
+    while True:
+        key = decode()
+        expect(":")
+        yield key, decode()
+        if token() == "}":
+            return
+        expect(",")
+
+
+def dump(items, f, encoded=False):
+    """writes the (key, value) pairs of items to f as one JSON object, an
+    entry per line, the values being JSON text already if encoded is set"""
+    f.write("{\n")
+    sep = ""
+    for key, value in items:
+        f.write(sep)
+        f.write(json_codec.dumps(key))
+        f.write(": ")
+        f.write(value if encoded else json_codec.dumps(value))
+        sep = ",\n"
+    f.write("\n}\n")
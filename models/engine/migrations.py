@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Contains the schema migrations of DBStorage
+
+create_all() creates the missing tables with every index of the models,
+but never changes a table that already exists. The migrations below bring
+such tables up to date. Each one runs once, in its own transaction, and
+the number of the last one applied is kept in the schema_version table.
+They check the schema before changing it, so they also pass on tables
+create_all() just made. On MySQL, the indexes of the foreign keys are
+left to InnoDB, which creates them along with the foreign keys.
+
+To change the schema, update the model and append a migration to
+MIGRATIONS; never edit or reorder the ones already released.
+"""
+import sqlalchemy
+from sqlalchemy import Column, Integer, MetaData, Table
+
+metadata = MetaData()
+schema_version = Table("schema_version", metadata,
+                       Column("version", Integer, nullable=False))
+# list - (table, column) of the foreign keys looked up by the relationships
+FOREIGN_KEYS = [("cities", "state_id"), ("places", "city_id"),
+                ("places", "user_id"), ("reviews", "place_id"),
+                ("reviews", "user_id"), ("place_amenity", "amenity_id")]
+
+
+def create_index(conn, tables, table, name):
+    """creates the index name of table, as declared on the models, unless
+    it exists"""
+    for index in tables[table].indexes:
+        if index.name == name:
+            index.create(conn, checkfirst=True)
+            return
+    raise ValueError("{} has no index {}".format(table, name))
+
+
+def add_column(conn, tables, table, name):
+    """adds the column name of table, as declared on the models, unless it
+    exists"""
+    existing = sqlalchemy.inspect(conn).get_columns(table)
+    if name in [column["name"] for column in existing]:
+        return
+    column = tables[table].c[name]
+    conn.execute(sqlalchemy.schema.DDL("ALTER TABLE {} ADD COLUMN {}".format(
+        conn.dialect.identifier_preparer.format_table(tables[table]),
+        sqlalchemy.schema.CreateColumn(column).compile(dialect=conn.dialect))))
+
+
+def not_mysql(ddl, target, bind, dialect=None, **kwargs):
+    """returns False on MySQL, whose InnoDB engine indexes every foreign
+    key by itself"""
+    return dialect.name != "mysql"
+
+
+def skip_foreign_key_indexes(tables):
+    """keeps create_all() and the migrations from creating the indexes of
+    the foreign keys on MySQL, where they would duplicate those of InnoDB"""
+    for table, column in FOREIGN_KEYS:
+        for index in tables[table].indexes:
+            if index.name == "ix_{}_{}".format(table, column):
+                index.ddl_if(callable_=not_mysql)
+
+
+def index_foreign_keys(conn, tables):
+    """indexes the foreign keys looked up by the relationships, except on
+    MySQL"""
+    for table, column in FOREIGN_KEYS:
+        create_index(conn, tables, table, "ix_{}_{}".format(table, column))
+
+
+def index_places_by_price(conn, tables):
+    """indexes the places of a city by price"""
+    create_index(conn, tables, "places", "ix_places_city_id_price_by_night")
+
+
+def unique_user_email(conn, tables):
+    """makes the email of the users unique and indexed
+
+    Users sharing an email must be merged or given their own email by hand
+    first: until then the migration fails, naming some of those emails.
+    """
+    email = tables["users"].c.email
+    shared = conn.execute(sqlalchemy.select(email).group_by(email).having(
+        sqlalchemy.func.count() > 1).limit(5)).scalars().all()
+    if shared:
+        raise ValueError("several users have the email {}; give each user "
+                         "its own email before starting again".format(
+                             ", ".join(shared)))
+    create_index(conn, tables, "users", "ux_users_email")
+
+
+# list - every migration in order, the version being its position + 1
+MIGRATIONS = [index_foreign_keys, index_places_by_price, unique_user_email]
+
+
+def version(conn):
+    """returns the version of the schema, 0 for none"""
+    return conn.execute(sqlalchemy.select(
+        sqlalchemy.func.max(schema_version.c.version))).scalar() or 0
+
+
+def migrate(engine, tables):
+    """applies the migrations newer than the schema version, tables being
+    the tables of the models by name, and returns the new version"""
+    metadata.create_all(engine)
+    with engine.connect() as conn:
+        current = version(conn)
+    for number, migration in enumerate(MIGRATIONS, 1):
+        if number <= current:
+            continue
+        with engine.begin() as conn:
+            migration(conn, tables)
+            conn.execute(schema_version.delete())
+            conn.execute(schema_version.insert().values(version=number))
+        current = number
+    return current
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+"""Contains the PlaceColumns class
+
+The numeric attributes of the places are kept one array per attribute,
+so a range filter is evaluated over whole columns at once. NumPy arrays
+are used when NumPy is installed, stdlib arrays otherwise.
+"""
+from array import array
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COLUMNS = ("number_rooms", "number_bathrooms", "max_guest",
+           "price_by_night", "latitude", "longitude")
+
+
+class PlaceColumns:
+    """numeric attributes of places stored column by column
+
+    Every column holds floats, NaN standing for a missing or non numeric
+    value, which no range matches. Removing a place moves the last row
+    into its slot, so rows stay packed.
+    """
+
+    def __init__(self):
+        """creates an empty store"""
+        self.clear()
+
+    def __len__(self):
+        """returns the number of places stored"""
+        return len(self.__ids)
+
+    def clear(self):
+        """removes every place"""
+        self.__ids = []
+        self.__rows = {}
+        if numpy is not None:
+            self.__columns = {name: numpy.empty(1024) for name in COLUMNS}
+        else:
+            self.__columns = {name: array('d') for name in COLUMNS}
+
+    def set(self, place_id, get):
+        """stores the place place_id, get(name) returning its attributes"""
+        row = self.__rows.get(place_id)
+        if row is None:
+            row = self.__rows[place_id] = len(self.__ids)
+            self.__ids.append(place_id)
+            self.__grow()
+        for name, column in self.__columns.items():
+            column[row] = self.__number(get(name))
+
+    def remove(self, place_id):
+        """removes the place place_id if it is stored"""
+        row = self.__rows.pop(place_id, None)
+        if row is None:
+            return
+        last = len(self.__ids) - 1
+        if row != last:
+            moved = self.__ids[last]
+            self.__ids[row] = moved
+            self.__rows[moved] = row
+            for column in self.__columns.values():
+                column[row] = column[last]
+        self.__ids.pop()
+        if numpy is None:
+            for column in self.__columns.values():
+                column.pop()
+
+    def select(self, **ranges):
+        """returns the ids of the places whose attributes fall in ranges
+
+        Each keyword is a column name and its value a (min, max) pair of
+        inclusive bounds, None leaving a bound open:
+            select(price_by_night=(50, 150), max_guest=(4, None))
+        """
+        for name, (low, high) in ranges.items():
+            if name not in self.__columns:
+                raise ValueError("{} is not a Place column".format(name))
+        count = len(self.__ids)
+        if numpy is not None:
+            mask = numpy.ones(count, dtype=bool)
+            for name, (low, high) in ranges.items():
+                column = self.__columns[name][:count]
+                if low is not None:
+                    mask &= column >= low
+                if high is not None:
+                    mask &= column <= high
+            return [self.__ids[row] for row in numpy.flatnonzero(mask)]
+        rows = None
+        for name, (low, high) in ranges.items():
+            column = self.__columns[name]
+            low = -math.inf if low is None else low
+            high = math.inf if high is None else high
+            if rows is None:
+                rows = [row for row, value in enumerate(column)
+                        if low <= value <= high]
+            else:
+                rows = [row for row in rows if low <= column[row] <= high]
+        if rows is None:
+            return list(self.__ids)
+        return [self.__ids[row] for row in rows]
+
+    def __grow(self):
+        """makes room in every column for the last id"""
+        count = len(self.__ids)
+        for name, column in self.__columns.items():
+            if numpy is None:
+                column.append(math.nan)
+            elif len(column) < count:
+                bigger = numpy.empty(2 * len(column))
+                bigger[:len(column)] = column
+                self.__columns[name] = bigger
+
+    @staticmethod
+    def __number(value):
+        """returns value as a float, NaN if it is not a number"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
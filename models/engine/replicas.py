@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Contains the ReplicaRouter and RoutingSession classes
+
+A RoutingSession reads through one of the replicas a ReplicaRouter hands
+out in turn, and writes through its primary bind. Once it has written, it
+pins itself to the primary, so a request reads its own writes; the pin
+goes with the session, at the end of the request.
+"""
+import math
+import sqlalchemy
+from sqlalchemy.orm import Session
+import threading
+import time
+
+
+class ReplicaRouter:
+    """hands out replica engines in turn, skipping the unhealthy ones
+
+    A replica is checked with a SELECT 1 when it has not been for interval
+    seconds; one failing its check is left out for interval seconds.
+    """
+
+    def __init__(self, engines, interval=5.0):
+        """creates a router over the replica engines"""
+        self.__engines = list(engines)
+        self.__interval = interval
+        self.__next = 0
+        # dictionary - engine: time of its last successful check
+        self.__checked = {}
+        # dictionary - engine: time before which it is left out
+        self.__down = {}
+        self.__lock = threading.Lock()
+
+    def pick(self):
+        """returns the next healthy replica, or None if none is"""
+        for _ in range(len(self.__engines)):
+            with self.__lock:
+                engine = self.__engines[self.__next]
+                self.__next = (self.__next + 1) % len(self.__engines)
+            if self.__healthy(engine):
+                return engine
+        return None
+
+    def status(self):
+        """returns the url, health and pool statistics of every replica"""
+        now = time.monotonic()
+        replicas = []
+        for engine in self.__engines:
+            replica = {"url": engine.url.render_as_string(),
+                       "healthy": now >= self.__down.get(engine, 0)}
+            stats = getattr(engine.pool, "stats", None)
+            if stats is not None:
+                replica.update(stats())
+            replicas.append(replica)
+        return replicas
+
+    def dispose(self):
+        """closes the connections of every replica"""
+        for engine in self.__engines:
+            engine.dispose()
+
+    def __healthy(self, engine):
+        """returns True unless engine is down or fails its check"""
+        now = time.monotonic()
+        if now < self.__down.get(engine, 0):
+            return False
+        if now - self.__checked.get(engine, -math.inf) < self.__interval:
+            return True
+        try:
+            with engine.connect() as conn:
+                conn.execute(sqlalchemy.text("SELECT 1"))
+        except sqlalchemy.exc.DBAPIError:
+            self.__down[engine] = now + self.__interval
+            return False
+        self.__checked[engine] = now
+        return True
+
+
+class RoutingSession(Session):
+    """Session reading from the replicas of router until it writes"""
+
+    def __init__(self, router=None, **kwargs):
+        """creates a session whose bind is the primary database"""
+        super().__init__(**kwargs)
+        self.router = router
+        self.pinned = False
+        self.replica = None
+
+    def pin(self):
+        """sends every statement of the session to the primary from now"""
+        self.pinned = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """returns the primary while flushing or pinned, a replica else"""
+        if self._flushing or isinstance(clause, sqlalchemy.sql.dml.UpdateBase):
+            self.pinned = True
+        if not self.pinned and self.router is not None:
+            if self.replica is None:
+                self.replica = self.router.pick()
+            if self.replica is not None:
+                return self.replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""Contains the ReadWriteLock class"""
+from contextlib import contextmanager
+import threading
+
+
+class ReadWriteLock:
+    """lets any number of readers or a single writer hold the lock
+
+    A waiting writer keeps new readers out, so a stream of readers cannot
+    starve it, and writers are let in in the order they arrived. Both sides
+    are reentrant, and the writer may also take the read side; a reader may
+    not upgrade to the write side.
+    """
+
+    def __init__(self):
+        """creates an unlocked lock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__local = threading.local()
+        self.__readers = 0
+        self.__writer = None
+        self.__depth = 0
+        self.__tickets = 0
+        self.__serving = 0
+        self.__abandoned = set()
+
+    def acquire_read(self):
+        """blocks until no writer holds or waits for the lock"""
+        local = self.__local
+        reads = getattr(local, "reads", 0)
+        if reads or self.__writer == threading.get_ident():
+            local.reads = reads + 1
+            return
+        with self.__cond:
+            while self.__writer is not None or self.__serving < self.__tickets:
+                self.__cond.wait()
+            self.__readers += 1
+        local.reads = 1
+        local.shared = True
+
+    def release_read(self):
+        """releases one hold of the read side"""
+        local = self.__local
+        local.reads -= 1
+        if local.reads == 0 and getattr(local, "shared", False):
+            local.shared = False
+            with self.__cond:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__cond.notify_all()
+
+    def acquire_write(self):
+        """blocks until the calling thread is the only holder of the lock"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+            if getattr(self.__local, "reads", 0):
+                raise RuntimeError("cannot upgrade a read lock")
+            ticket = self.__tickets
+            self.__tickets += 1
+            try:
+                while (self.__serving != ticket or
+                       self.__writer is not None or self.__readers):
+                    self.__cond.wait()
+            except BaseException:
+                # let the writers queued behind an interrupted one in
+                self.__abandoned.add(ticket)
+                self.__advance()
+                self.__cond.notify_all()
+                raise
+            self.__serving += 1
+            self.__advance()
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self):
+        """releases one hold of the write side"""
+        with self.__cond:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    def __advance(self):
+        """moves the turn past the tickets of interrupted writers"""
+        while self.__serving in self.__abandoned:
+            self.__abandoned.remove(self.__serving)
+            self.__serving += 1
+
+    @contextmanager
+    def read(self):
+        """holds the read side for the duration of a with block"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """holds the write side for the duration of a with block"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
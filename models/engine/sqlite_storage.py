@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""Contains the class SQLiteStorage"""
+from models.engine.db_storage import DBStorage, TimedQueuePool
+from os import getenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+# statements run on every new connection
+pragmas = ["PRAGMA journal_mode=WAL",
+           "PRAGMA synchronous=NORMAL",
+           "PRAGMA foreign_keys=ON",
+           "PRAGMA busy_timeout=5000",
+           "PRAGMA cache_size=-65536",
+           "PRAGMA temp_store=MEMORY",
+           "PRAGMA mmap_size=268435456"]
+
+
+class SQLiteStorage(DBStorage):
+    """interacts with an embedded SQLite database
+
+    The database file is set by HBNB_SQLITE_DB (default: hbnb.db), or
+    ":memory:" for a private in-memory database. HBNB_SQLITE_REPLICAS
+    lists the files of read replicas, comma separated.
+    """
+
+    def make_engine(self):
+        """returns the engine of the SQLite database"""
+        path = getenv('HBNB_SQLITE_DB', 'hbnb.db')
+        if path == ":memory:":
+            # every session must see the one in-memory database
+            engine = create_engine('sqlite://', poolclass=StaticPool,
+                                   connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine('sqlite:///{}'.format(path),
+                                   poolclass=TimedQueuePool,
+                                   connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", self.set_pragmas)
+        return engine
+
+    def replica_urls(self):
+        """returns the URLs of the read replicas, opened read-only"""
+        paths = getenv('HBNB_SQLITE_REPLICAS', "")
+        return ['sqlite:///file:{}?mode=ro&uri=true'.format(path.strip())
+                for path in paths.split(",") if path.strip()]
+
+    def make_replica(self, url):
+        """returns the engine of the read replica at url"""
+        return create_engine(url, poolclass=TimedQueuePool,
+                             connect_args={"check_same_thread": False})
+
+    @staticmethod
+    def set_pragmas(dbapi_connection, connection_record):
+        """tunes a new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+"""Contains the TestAppDocs and TestAppConcurrency classes"""
+from api.v1 import app as app_module
+from api.v1.app import app
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import uuid
+
+
+class TestAppDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the API app"""
+    def test_pep8_conformance_app(self):
+        """Test that api/v1/app.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/app.py',
+                                    'tests/test_api/test_v1/test_app.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_app_module_docstring(self):
+        """Test for the app.py module docstring"""
+        self.assertTrue(len(app_module.__doc__) >= 1)
+
+
+@unittest.skipIf(not isinstance(models.storage, FileStorage),
+                 "not testing file storage")
+class TestAppConcurrency(unittest.TestCase):
+    """Hammer the API with concurrent requests against FileStorage"""
+    threads = 8
+    rounds = 15
+
+    def setUp(self):
+        """points the storage to an empty file in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = FileStorage._FileStorage__file_path
+        self.objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__file_path = os.path.join(self.tmp.name,
+                                                           "file.json")
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """restores the storage"""
+        FileStorage._FileStorage__file_path = self.path
+        FileStorage._FileStorage__objects = self.objects
+        self.tmp.cleanup()
+
+    def hammer(self, errors):
+        """creates, reads, updates and deletes States and Cities"""
+        client = app.test_client()
+        try:
+            for i in range(self.rounds):
+                res = client.post('/api/v1/states', json={"name": str(i)})
+                self.assertEqual(res.status_code, 201)
+                state_id = res.get_json()["id"]
+                res = client.post('/api/v1/states/{}/cities'.format(state_id),
+                                  json={"name": "c" + str(i)})
+                self.assertEqual(res.status_code, 201)
+                for url in ['/api/v1/states', '/api/v1/stats',
+                            '/api/v1/states/{}'.format(state_id),
+                            '/api/v1/states/{}/cities'.format(state_id)]:
+                    self.assertEqual(client.get(url).status_code, 200)
+                res = client.put('/api/v1/states/{}'.format(state_id),
+                                 json={"name": "renamed"})
+                self.assertEqual(res.status_code, 200)
+                if i % 2:
+                    res = client.delete('/api/v1/states/{}'.format(state_id))
+                    self.assertEqual(res.status_code, 200)
+        except BaseException as e:
+            errors.append(e)
+
+    def test_concurrent_requests(self):
+        """Test that concurrent requests neither fail nor lose writes"""
+        errors = []
+        workers = [threading.Thread(target=self.hammer, args=(errors,))
+                   for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+        kept = self.threads * (self.rounds - self.rounds // 2)
+        stats = app.test_client().get('/api/v1/stats').get_json()
+        self.assertEqual(stats["states"], kept)
+        self.assertEqual(stats["cities"], self.threads * self.rounds)
+        models.storage.reload()
+        self.assertEqual(models.storage.count("State"), kept)
+
+
+class TestPoolStats(unittest.TestCase):
+    """Test the connection pool statistics endpoint"""
+    def test_pool_stats(self):
+        """Test that it is only served with HBNB_API_POOL_STATS=1 and a
+        database storage"""
+        client = app.test_client()
+        with mock.patch.dict(os.environ, {"HBNB_API_POOL_STATS": "0"}):
+            res = client.get('/api/v1/stats/pool')
+            self.assertEqual(res.status_code, 404)
+        with mock.patch.dict(os.environ, {"HBNB_API_POOL_STATS": "1"}):
+            res = client.get('/api/v1/stats/pool')
+            if not hasattr(models.storage, "pool_stats"):
+                self.assertEqual(res.status_code, 404)
+                return
+            self.assertEqual(res.status_code, 200)
+            self.assertIn("pool", res.get_json())
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestUsers(unittest.TestCase):
+    """Test the users endpoints on a database"""
+    def test_duplicate_email(self):
+        """Test that a second user with the same email is refused"""
+        client = app.test_client()
+        user = {"email": "{}@hbnb.io".format(uuid.uuid4()), "password": "pwd"}
+        res = client.post('/api/v1/users', json=user)
+        self.assertEqual(res.status_code, 201)
+        res = client.post('/api/v1/users', json=user)
+        self.assertEqual(res.status_code, 400)
+        # the session was rolled back and serves the next requests
+        res = client.post('/api/v1/users', json=dict(user, email="x" +
+                                                     user["email"]))
+        self.assertEqual(res.status_code, 201)
+        emails = [u["email"] for u in client.get('/api/v1/users').get_json()]
+        self.assertEqual(emails.count(user["email"]), 1)
+
+
+@unittest.skipIf(not isinstance(models.storage, FileStorage),
+                 "not testing file storage")
+class TestPlacesSearch(unittest.TestCase):
+    """Test places_search on the file storage"""
+    def setUp(self):
+        """fills an empty storage with places in two states"""
+        self.objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        user = User(email="a@b.c", password="pwd")
+        self.wifi, self.pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        self.california = State(name="California")
+        nevada = State(name="Nevada")
+        self.cities = [City(name="SF", state_id=self.california.id),
+                       City(name="LA", state_id=self.california.id),
+                       City(name="Reno", state_id=nevada.id)]
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id)
+                  for i, city in enumerate(self.cities * 2)]
+        places[0].amenity_ids = [self.wifi.id, self.pool.id]
+        places[1].amenity_ids = [self.wifi.id]
+        places[2].amenity_ids = [self.wifi.id, self.pool.id]
+        for obj in ([user, self.wifi, self.pool, self.california, nevada] +
+                    self.cities + places):
+            models.storage.new(obj)
+
+    def tearDown(self):
+        """restores the storage"""
+        FileStorage._FileStorage__dirty.clear()
+        FileStorage._FileStorage__objects = self.objects
+
+    def search(self, **body):
+        """returns the names of the places found"""
+        res = app.test_client().post('/api/v1/places_search', json=body)
+        self.assertEqual(res.status_code, 200)
+        return [place["name"] for place in res.get_json()]
+
+    def test_places_search(self):
+        """Test the filters, their combination and paging"""
+        self.assertEqual(self.search(), ["0", "1", "2", "3", "4", "5"])
+        self.assertEqual(self.search(states=[self.california.id],
+                                     cities=[self.cities[0].id]),
+                         ["0", "1", "3", "4"])
+        self.assertEqual(self.search(amenities=[self.wifi.id,
+                                                self.pool.id]),
+                         ["0", "2"])
+        self.assertEqual(self.search(states=[self.california.id],
+                                     amenities=[self.wifi.id]),
+                         ["0", "1"])
+        self.assertEqual(self.search(offset=1, limit=2), ["1", "2"])
+        res = app.test_client().post('/api/v1/places_search',
+                                     json={"limit": -1})
+        self.assertEqual(res.status_code, 400)
+
+    def test_places_search_invalid_filter(self):
+        """Test that filters other than lists of ids are refused"""
+        client = app.test_client()
+        for body in [{"states": self.california.id}, {"cities": [1]},
+                     {"amenities": {"id": self.wifi.id}},
+                     {"states": [["x"]]}]:
+            with self.subTest(body=body):
+                res = client.post('/api/v1/places_search', json=body)
+                self.assertEqual(res.status_code, 400)
+                self.assertIn(b"Invalid filter", res.data)
+        res = client.post('/api/v1/places_search', data="[]",
+                          content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn(b"Not a JSON", res.data)
@@ -2,6 +2,7 @@
 """Test BaseModel for expected behavior and documentation"""
 from datetime import datetime, timedelta, timezone
 import inspect
+import json
 import models
 import pep8 as pycodestyle
 import time
@@ -169,3 +170,45 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    def test_parse_and_format_time(self):
+        """Test the timestamp codec against strptime and strftime"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        for string in ["2017-09-28T21:03:54.052298",
+                       "2017-09-28T21:03:54.000000", "2017-9-28T21:03:54.5"]:
+            with self.subTest(string=string):
+                parsed = models.base_model.parse_time(string)
+                self.assertEqual(parsed, datetime.strptime(string, t_format))
+        now = datetime.utcnow().replace(microsecond=0)
+        self.assertEqual(models.base_model.format_time(now),
+                         now.strftime(t_format))
+        with self.assertRaises(ValueError):
+            models.base_model.parse_time("not a time")
+
+    def test_from_dicts(self):
+        """Test that from_dicts builds the same objects with or without
+        trusting its input"""
+        dicts = [BaseModel(name=str(i)).to_dict() for i in range(3)]
+        for trusted in [False, True]:
+            with self.subTest(trusted=trusted):
+                values = [dict(value) for value in dicts]
+                objs = BaseModel.from_dicts(iter(values), trusted)
+                self.assertEqual([obj.to_dict() for obj in objs], dicts)
+                self.assertIs(type(objs[0].created_at), datetime)
+                self.assertNotIn("__class__", objs[0].__dict__)
+                # trusted dictionaries become the attributes of the objects
+                self.assertIs(objs[0].__dict__ is values[0],
+                              trusted and models.storage_t != "db")
+
+    def test_to_dict_cache(self):
+        """Test that to_dict and to_json are cached until an attribute is
+        set"""
+        bm = BaseModel()
+        first = bm.to_dict()
+        first["name"] = "changed"
+        self.assertNotIn("name", bm.to_dict())
+        self.assertIs(bm.to_json(), bm.to_json())
+        self.assertEqual(json.loads(bm.to_json()), bm.to_dict())
+        bm.name = "Holberton"
+        self.assertEqual(bm.to_dict()["name"], "Holberton")
+        self.assertEqual(json.loads(bm.to_json())["name"], "Holberton")
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Contains the TestBinarySnapshotDocs and TestBinarySnapshot classes"""
+from datetime import datetime
+import inspect
+import json
+from models.engine import binary_snapshot
+import os
+import pep8
+import tempfile
+import unittest
+Snapshot = binary_snapshot.Snapshot
+
+
+class TestBinarySnapshotDocs(unittest.TestCase):
+    """Tests to check the documentation and style of binary_snapshot"""
+    def test_pep8_conformance_binary_snapshot(self):
+        """Test that models/engine/binary_snapshot.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/binary_snapshot.py',
+                                    'tests/test_models/test_engine/\
+test_binary_snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_binary_snapshot_docstrings(self):
+        """Test for the module, class and function docstrings"""
+        self.assertTrue(len(binary_snapshot.__doc__) >= 1)
+        self.assertTrue(len(Snapshot.__doc__) >= 1)
+        funcs = inspect.getmembers(binary_snapshot, inspect.isfunction)
+        funcs += inspect.getmembers(Snapshot, inspect.isfunction)
+        for name, func in funcs:
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """Test the binary snapshot writer, reader and JSON converters"""
+    entries = {
+        "State.1": {"__class__": "State", "id": "1", "name": "California",
+                    "created_at": "2017-09-28T21:03:54.052298",
+                    "updated_at": "2017-09-28T21:03:54.052302"},
+        "Place.2": {"__class__": "Place", "id": "2", "name": "California",
+                    "number_rooms": 3, "latitude": 37.77, "description": None,
+                    "amenity_ids": ["a", "b"], "extra": {"x": [1]},
+                    "huge": 1 << 70, "flag": True}
+    }
+
+    def setUp(self):
+        """Creates a temporary directory for the snapshot files"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.bin")
+        with open(self.path, "wb") as f:
+            binary_snapshot.write(f, self.entries.items())
+
+    def tearDown(self):
+        """Removes the temporary directory"""
+        self.tmp.cleanup()
+
+    def test_records(self):
+        """Test that records come back with native timestamps"""
+        self.assertTrue(binary_snapshot.is_snapshot(self.path))
+        snap = Snapshot(self.path)
+        self.assertEqual(sorted(snap.classes()), ["Place", "State"])
+        self.assertEqual(snap.count("State"), 1)
+        self.assertEqual(snap.count("User"), 0)
+        state, = snap.records("State")
+        self.assertEqual(state["created_at"],
+                         datetime(2017, 9, 28, 21, 3, 54, 52298))
+        place, = snap.records("Place")
+        expected = dict(self.entries["Place.2"])
+        del expected["__class__"]
+        self.assertEqual(place, expected)
+        self.assertIs(place["flag"], True)
+        snap.close()
+
+    def test_json_round_trip(self):
+        """Test that export and import keep every entry"""
+        exported = os.path.join(self.tmp.name, "file.json")
+        binary_snapshot.to_json(self.path, exported)
+        with open(exported, "r") as f:
+            self.assertEqual(json.load(f), self.entries)
+        imported = os.path.join(self.tmp.name, "copy.bin")
+        binary_snapshot.from_json(exported, imported)
+        with open(self.path, "rb") as a, open(imported, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertFalse(binary_snapshot.is_snapshot(exported))
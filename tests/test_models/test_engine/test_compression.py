@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Contains the TestCompressionDocs and TestCompression classes"""
+import inspect
+import io
+import os
+from models.engine import compression
+import pep8
+import unittest
+
+
+class TestCompressionDocs(unittest.TestCase):
+    """Tests to check the documentation and style of compression"""
+    def test_pep8_conformance_compression(self):
+        """Test that models/engine/compression.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/compression.py',
+                                    'tests/test_models/test_engine/\
+test_compression.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_compression_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(compression.__doc__) >= 1)
+        for name, func in inspect.getmembers(compression,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestCompression(unittest.TestCase):
+    """Test the compressed readers and writers"""
+    def test_method(self):
+        """Test that the setting wins over the extension"""
+        self.assertEqual(compression.method("file.json"), None)
+        self.assertEqual(compression.method("file.json.gz"), "gzip")
+        self.assertEqual(compression.method("file.json.xz"), "lzma")
+        self.assertEqual(compression.method("file.json", "lzma"), "lzma")
+        self.assertEqual(compression.method("file.json.gz", "none"), None)
+        with self.assertRaises(ValueError):
+            compression.method("file.json", "zip")
+
+    def test_round_trip(self):
+        """Test that every method writes what reader() reads back, leaving
+        the binary file open"""
+        entries = ['"{}": "é"'.format(i) for i in range(1000)]
+        text = "{\n" + ",\n".join(entries) + "\n}\n"
+        for name in [None, "gzip", "lzma"]:
+            with self.subTest(method=name):
+                f = io.BytesIO()
+                with compression.writer(f, name) as out:
+                    out.write(text)
+                self.assertFalse(f.closed)
+                f.seek(0)
+                self.assertEqual(compression.detect(f), name)
+                if name is not None:
+                    self.assertLess(len(f.getvalue()), len(text))
+                with open("file_compression.tmp", "wb") as out:
+                    out.write(f.getvalue())
+                with compression.reader("file_compression.tmp") as src:
+                    self.assertEqual(src.read(), text)
+
+    def tearDown(self):
+        """removes the file written by the tests"""
+        if os.path.exists("file_compression.tmp"):
+            os.remove("file_compression.tmp")
@@ -14,10 +14,14 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
+# HBNB_TYPE_STORAGE=sqlite also sets storage_t to "db", without MySQL
+mysql = os.getenv("HBNB_TYPE_STORAGE") == "db"
 
 
 class TestDBStorageDocs(unittest.TestCase):
@@ -84,7 +88,7 @@ class TestDBStorage(unittest.TestCase):
     def test_save(self):
         """Test that save properly saves objects to file.json"""
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_delete(self):
         """Test that delete removes an object from the database"""
         storage = DBStorage()
@@ -96,7 +100,7 @@ class TestDBStorage(unittest.TestCase):
         deleted_state = storage.get(State, new_state.id)
         self.assertIsNone(deleted_state)
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_reload(self):
         """Test that reload loads objects from the database"""
         storage = DBStorage()
@@ -104,7 +108,7 @@ class TestDBStorage(unittest.TestCase):
         all_objs = storage.all()
         self.assertIsInstance(all_objs, dict)
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_close(self):
         """Test that close removes the session"""
         storage = DBStorage()
@@ -112,7 +116,7 @@ class TestDBStorage(unittest.TestCase):
         storage.close()
         self.assertIsNone(storage._DBStorage__session.registry().session())
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_get(self):
         """Test that get returns the correct object or None"""
         storage = DBStorage()
@@ -122,7 +126,7 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(storage.get(State, new_state.id), new_state)
         self.assertIsNone(storage.get(State, "nonexistent_id"))
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_count(self):
         """Test that count returns the correct number of objects"""
         storage = DBStorage()
@@ -136,7 +140,7 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(storage.count(State), initial_count + 2)
         self.assertEqual(storage.count(City), 0)
 
-    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    @unittest.skipIf(not mysql, "not testing MySQL storage")
     def test_count_all(self):
         """Test that count returns the correct total number of objects"""
         storage = DBStorage()
@@ -147,3 +151,41 @@ class TestDBStorage(unittest.TestCase):
         storage.new(new_city)
         storage.save()
         self.assertEqual(storage.count(), initial_count + 2)
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test the connection pool settings and statistics"""
+    def test_pool_options(self):
+        """Test that the pool is configured from HBNB_MYSQL_POOL_*"""
+        env = {"HBNB_MYSQL_POOL_SIZE": "20", "HBNB_MYSQL_MAX_OVERFLOW": "0",
+               "HBNB_MYSQL_POOL_TIMEOUT": "2.5",
+               "HBNB_MYSQL_POOL_RECYCLE": "600",
+               "HBNB_MYSQL_POOL_PRE_PING": "0"}
+        with mock.patch.dict(os.environ, env):
+            options = DBStorage.pool_options()
+        self.assertIs(options["poolclass"], db_storage.TimedQueuePool)
+        self.assertEqual(options["pool_size"], 20)
+        self.assertEqual(options["max_overflow"], 0)
+        self.assertEqual(options["pool_timeout"], 2.5)
+        self.assertEqual(options["pool_recycle"], 600)
+        self.assertFalse(options["pool_pre_ping"])
+
+    def test_timed_queue_pool(self):
+        """Test that checkouts, waits and timeouts are counted"""
+        engine = sqlalchemy.create_engine(
+            "sqlite://", poolclass=db_storage.TimedQueuePool, pool_size=1,
+            max_overflow=0, pool_timeout=0.05)
+        try:
+            with engine.connect():
+                with self.assertRaises(sqlalchemy.exc.TimeoutError):
+                    engine.connect()
+                stats = engine.pool.stats()
+                self.assertEqual(stats["checked_out"], 1)
+            stats = engine.pool.stats()
+            self.assertEqual(stats["checked_out"], 0)
+            self.assertEqual(stats["checkouts"], 2)
+            self.assertEqual(stats["timeouts"], 1)
+            self.assertGreaterEqual(stats["max_wait"], 0.05)
+            self.assertGreaterEqual(stats["wait_time"], stats["max_wait"])
+        finally:
+            engine.dispose()
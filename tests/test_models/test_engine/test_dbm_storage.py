@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""Contains the TestDBMStorageDocs and TestDBMStorage classes"""
+import inspect
+import models
+from models.engine import dbm_storage
+from models.city import City
+from models.state import State
+import os
+import pep8
+import tempfile
+import unittest
+from unittest import mock
+DBMStorage = dbm_storage.DBMStorage
+
+
+class TestDBMStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of DBMStorage class"""
+    def test_pep8_conformance_dbm_storage(self):
+        """Test that models/engine/dbm_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/dbm_storage.py',
+                                    'tests/test_models/test_engine/\
+test_dbm_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_dbm_storage_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(dbm_storage.__doc__) >= 1)
+        self.assertTrue(len(DBMStorage.__doc__) >= 1)
+        for name, func in inspect.getmembers(DBMStorage,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing dbm storage")
+class TestDBMStorage(unittest.TestCase):
+    """Test the DBMStorage class"""
+    def setUp(self):
+        """opens a storage on a new database in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = DBMStorage._DBMStorage__path
+        DBMStorage._DBMStorage__path = os.path.join(self.tmp.name, "hbnb")
+        self.storage = DBMStorage()
+        self.storage.reload()
+        # attribute changes are reported to models.storage
+        self.patch = mock.patch.object(models, "storage", self.storage)
+        self.patch.start()
+
+    def tearDown(self):
+        """closes the database and removes it"""
+        self.patch.stop()
+        self.storage._DBMStorage__db.close()
+        DBMStorage._DBMStorage__path = self.path
+        DBMStorage._DBMStorage__cache_size = 1024
+        self.tmp.cleanup()
+
+    def test_save_and_reload(self):
+        """Test that saved objects, counts and deletions persist"""
+        states = [State(name=str(i)) for i in range(3)]
+        for state in states:
+            self.storage.new(state)
+        self.assertEqual(self.storage.count(State), 3)
+        self.storage.save()
+        self.storage.delete(states[0])
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count("State"), 2)
+        self.assertIsNone(self.storage.get(State, states[0].id))
+        self.assertEqual(self.storage.get(State, states[1].id).name, "1")
+        self.assertEqual(set(self.storage.all(State)),
+                         {"State." + s.id for s in states[1:]})
+        self.assertEqual(self.storage.all(City), {})
+
+    def test_related_index(self):
+        """Test that the foreign key index follows changes"""
+        first = State(name="California")
+        second = State(name="Nevada")
+        city = City(name="Reno", state_id=first.id)
+        for obj in (first, second, city):
+            self.storage.new(obj)
+        self.assertEqual(first.cities, [city])
+        self.storage.save()
+        self.storage.reload()
+        first = self.storage.get(State, first.id)
+        second = self.storage.get(State, second.id)
+        city = self.storage.get(City, city.id)
+        self.assertEqual(first.cities, [city])
+        city.state_id = second.id
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, first.id).cities, [])
+        self.assertEqual([c.name for c in
+                          self.storage.get(State, second.id).cities],
+                         ["Reno"])
+
+    def test_lru_cache(self):
+        """Test that the cache is bounded but instances stay unique"""
+        DBMStorage._DBMStorage__cache_size = 2
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.storage.reload()
+        held = self.storage.get(State, states[0].id)
+        for state in states[1:]:
+            self.storage.get(State, state.id)
+        self.assertEqual(len(self.storage._DBMStorage__cache), 2)
+        self.assertIs(self.storage.get(State, states[0].id), held)
+        # an instance evicted from the cache still reports its changes
+        for state in states[1:]:
+            self.storage.get(State, state.id)
+        held.name = "renamed"
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, held.id).name, "renamed")
@@ -14,8 +14,16 @@ from models.user import User
 import json
 import os
 import pep8
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
@@ -69,11 +77,12 @@ class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_all_returns_dict(self):
-        """Test that all returns the FileStorage.__objects attr"""
+        """Test that all returns a copy of the FileStorage.__objects attr"""
         storage = FileStorage()
         new_dict = storage.all()
         self.assertEqual(type(new_dict), dict)
-        self.assertIs(new_dict, storage._FileStorage__objects)
+        self.assertEqual(new_dict, storage._FileStorage__objects)
+        self.assertIsNot(new_dict, storage._FileStorage__objects)
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_all_with_class(self):
@@ -138,7 +147,7 @@ class TestFileStorage(unittest.TestCase):
         storage.reload()
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
-        loaded_dict = FileStorage._FileStorage__objects
+        loaded_dict = storage.all()
         for key in new_dict:
             self.assertIn(key, loaded_dict)
             self.assertEqual(new_dict[key]["id"], loaded_dict[key].id)
@@ -186,3 +195,824 @@ class TestFileStorage(unittest.TestCase):
         self.assertEqual(storage.count(State), 2)
         self.assertEqual(storage.count(City), 0)
         FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_journal_appends_changed_keys(self):
+        """Test that journal mode appends only the changed keys"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_journal.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            first = State(name="California")
+            second = State(name="Nevada")
+            storage.new(first)
+            storage.new(second)
+            storage.save()
+            first.name = "Oregon"
+            storage.delete(second)
+            storage.save()
+            with open("file_journal.json.journal", "r") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), 2)
+            self.assertIn({"State." + second.id: None}, lines)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, first.id).name, "Oregon")
+            self.assertIsNone(storage.get(State, second.id))
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__journal = False
+            for path in ["file_journal.json", "file_journal.json.journal"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_journal_is_utf8(self):
+        """Test that the journal is UTF-8 whatever the locale encoding"""
+        script = ("from models.state import State\n"
+                  "state = State(name='Zurich')\n"
+                  "state.save()\n"
+                  "state.name = 'Z\\u00fcrich'\n"
+                  "state.save()\n"
+                  "print(state.id)\n")
+        env = dict(os.environ, HBNB_FILE_JOURNAL="1", PYTHONPATH=ROOT,
+                   LC_ALL="C", PYTHONCOERCECLOCALE="0", PYTHONUTF8="0")
+        env.pop("HBNB_TYPE_STORAGE", None)
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        with tempfile.TemporaryDirectory() as tmp:
+            oid = subprocess.check_output([sys.executable, "-c", script],
+                                          cwd=tmp, env=env).decode().strip()
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            try:
+                storage.reload()
+                self.assertEqual(storage.get(State, oid).name, "Z\u00fcrich")
+            finally:
+                FileStorage._FileStorage__objects = save
+                FileStorage._FileStorage__file_path = "file.json"
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_journal_compaction(self):
+        """Test that a full journal is folded into a new snapshot"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_journal.json"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_max_entries = 2
+        try:
+            storage.save()
+            states = [State(name=str(i)) for i in range(3)]
+            for state in states:
+                storage.new(state)
+                storage.save()
+            FileStorage._FileStorage__compactor.join()
+            self.assertFalse(os.path.exists("file_journal.json.journal.1"))
+            with open("file_journal.json", "r") as f:
+                snapshot = json.load(f)
+            self.assertIn("State." + states[1].id, snapshot)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.count(State), 3)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_max_entries = 10000
+            for path in ["file_journal.json", "file_journal.json.journal"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_compaction_skips_unsaved_changes(self):
+        """Test that a compaction writes what was saved, not the changes
+        made to the objects while it runs"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_journal.json"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_max_entries = 1
+        write = FileStorage._FileStorage__write_snapshot
+        changed = threading.Event()
+
+        def late_write(self, *args):
+            """writes the snapshot once the state was changed"""
+            changed.wait(5)
+            write(self, *args)
+        try:
+            storage.save()
+            state = State(name="saved")
+            storage.new(state)
+            with mock.patch.object(FileStorage,
+                                   "_FileStorage__write_snapshot",
+                                   late_write):
+                storage.save()
+                state.name = "not saved"
+                changed.set()
+                FileStorage._FileStorage__compactor.join()
+            self.assertFalse(os.path.exists("file_journal.json.journal.1"))
+            with open("file_journal.json", "r") as f:
+                snapshot = json.load(f)
+            self.assertEqual(snapshot["State." + state.id]["name"], "saved")
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_max_entries = 10000
+            for path in ["file_journal.json", "file_journal.json.journal"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_compaction_after_failed_fold(self):
+        """Test that the journal a failed fold left is folded later"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_journal.json"
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_max_entries = 2
+
+        def fail(self, *args):
+            """fails like a full disk"""
+            raise OSError("disk full")
+        try:
+            storage.save()
+            states = [State(name=str(i)) for i in range(4)]
+            with mock.patch.object(FileStorage,
+                                   "_FileStorage__write_snapshot", fail), \
+                    mock.patch.object(threading, "excepthook"):
+                for state in states[:2]:
+                    storage.new(state)
+                    storage.save()
+                FileStorage._FileStorage__compactor.join()
+            self.assertTrue(os.path.exists("file_journal.json.journal.1"))
+            for state in states[2:]:
+                storage.new(state)
+                storage.save()
+            FileStorage._FileStorage__compactor.join()
+            self.assertFalse(os.path.exists("file_journal.json.journal.1"))
+            self.assertFalse(os.path.exists("file_journal.json.journal"))
+            with open("file_journal.json", "r") as f:
+                self.assertEqual(len(json.load(f)), 4)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_max_entries = 10000
+            for path in ["file_journal.json", "file_journal.json.journal",
+                         "file_journal.json.journal.1"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_close_skips_unchanged_file(self):
+        """Test that close only reloads when the file changed on disk"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            instance = State(name="California")
+            storage.new(instance)
+            storage.save()
+            storage.close()
+            self.assertIs(storage.get(State, instance.id), instance)
+            other = instance.to_dict()
+            other["name"] = "Nevada, changed by another process"
+            with open("file.json", "w") as f:
+                json.dump({"State." + instance.id: other}, f)
+            storage.close()
+            reloaded = storage.get(State, instance.id)
+            self.assertIsNot(reloaded, instance)
+            self.assertEqual(reloaded.name, other["name"])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_close_applies_journal_tail(self):
+        """Test that close only applies new journal entries"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_journal.json"
+        FileStorage._FileStorage__journal = True
+        try:
+            kept = State(name="California")
+            storage.new(kept)
+            storage.save()
+            added = State(name="Nevada")
+            with open("file_journal.json.journal", "a") as f:
+                f.write(json.dumps({"State." + added.id: added.to_dict()}))
+                f.write("\n")
+            storage.close()
+            self.assertIs(storage.get(State, kept.id), kept)
+            self.assertEqual(storage.get(State, added.id).name, "Nevada")
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__journal = False
+            for path in ["file_journal.json", "file_journal.json.journal"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_class_index(self):
+        """Test that all, get and count follow the per-class index"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            state = State()
+            city = City(state_id=state.id)
+            storage.new(state)
+            storage.new(city)
+            self.assertEqual(storage.all("State"),
+                             {"State." + state.id: state})
+            self.assertEqual(list(storage.all(City).values()), [city])
+            self.assertIs(storage.get("City", city.id), city)
+            self.assertEqual(storage.count("State"), 1)
+            storage.delete(state)
+            self.assertEqual(storage.all(State), {})
+            self.assertEqual(storage.count(State), 0)
+            self.assertEqual(storage.count(City), 1)
+            FileStorage._FileStorage__objects = {"State." + state.id: state}
+            self.assertEqual(storage.count(State), 1)
+            self.assertEqual(storage.count(City), 0)
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_related_index(self):
+        """Test that the foreign key indexes follow attribute updates"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            california = State(name="California")
+            nevada = State(name="Nevada")
+            city = City(name="Reno", state_id=california.id)
+            place = Place(city_id=city.id)
+            for obj in [california, nevada, city, place]:
+                storage.new(obj)
+            self.assertEqual(california.cities, [city])
+            self.assertEqual(city.places, [place])
+            city.state_id = nevada.id
+            self.assertEqual(california.cities, [])
+            self.assertEqual(nevada.cities, [city])
+            # a value held by several objects, and one set after new()
+            other = City(name="Las Vegas", state_id=nevada.id)
+            late = City(name="Fresno")
+            storage.new(other)
+            storage.new(late)
+            late.state_id = nevada.id
+            self.assertEqual(nevada.cities, [city, other, late])
+            other.state_id = california.id
+            late.state_id = california.id
+            self.assertEqual(nevada.cities, [city])
+            self.assertEqual(california.cities, [other, late])
+            storage.delete(place)
+            self.assertEqual(storage.related(Place, "city_id", city.id), [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_binary_format_lazy_reload(self):
+        """Test that a binary snapshot builds objects on first access"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_binary.bin"
+        FileStorage._FileStorage__format = "binary"
+        try:
+            state = State(name="California")
+            city = City(name="Fremont", state_id=state.id)
+            storage.new(state)
+            storage.new(city)
+            storage.save()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(FileStorage._FileStorage__objects, {})
+            # counting reads the class table and builds nothing
+            self.assertEqual(storage.count(City), 1)
+            self.assertEqual(storage.count(), 2)
+            self.assertIn("City", FileStorage._FileStorage__pending)
+            self.assertEqual(FileStorage._FileStorage__objects, {})
+            loaded = storage.get(State, state.id)
+            self.assertEqual(loaded.to_dict(), state.to_dict())
+            self.assertEqual(storage.count(City), 1)
+            self.assertIn("City", FileStorage._FileStorage__pending)
+            self.assertEqual(loaded.cities[0].name, "Fremont")
+            storage.new(City(name="Oakland", state_id=state.id))
+            self.assertEqual(storage.count(City), 2)
+            self.assertEqual(storage.count(), 3)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__format = "json"
+            if os.path.exists("file_binary.bin"):
+                os.remove("file_binary.bin")
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_compressed_snapshot(self):
+        """Test that snapshots are compressed as set and read back
+        whatever their name"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        cases = [("file_gzip.json.gz", "", b"\x1f\x8b"),
+                 ("file_lzma.json", "lzma", b"\xfd7zXZ\x00"),
+                 ("file_plain.json.xz", "none", b"{")]
+        try:
+            for path, setting, magic in cases:
+                with self.subTest(path=path, setting=setting):
+                    FileStorage._FileStorage__objects = {}
+                    FileStorage._FileStorage__file_path = path
+                    FileStorage._FileStorage__compression = setting
+                    state = State(name="Califørnia")
+                    storage.new(state)
+                    storage.save()
+                    with open(path, "rb") as f:
+                        self.assertEqual(f.read(len(magic)), magic)
+                    FileStorage._FileStorage__compression = ""
+                    FileStorage._FileStorage__objects = {}
+                    storage.reload()
+                    self.assertEqual(storage.get(State, state.id).to_dict(),
+                                     state.to_dict())
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__compression = ""
+            for path, setting, magic in cases:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_sharded_layout(self):
+        """Test that shards are rewritten and loaded one class at a time"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_sharded.json"
+        FileStorage._FileStorage__sharded = True
+        try:
+            state = State(name="California")
+            city = City(name="Fremont", state_id=state.id)
+            storage.new(state)
+            storage.new(city)
+            storage.save()
+            self.assertFalse(os.path.exists("file_sharded.json"))
+            city_inode = os.stat("file_sharded.json.City").st_ino
+            state_inode = os.stat("file_sharded.json.State").st_ino
+            state.name = "Nevada"
+            storage.save()
+            self.assertEqual(os.stat("file_sharded.json.City").st_ino,
+                             city_inode)
+            self.assertNotEqual(os.stat("file_sharded.json.State").st_ino,
+                                state_inode)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.get(State, state.id).name, "Nevada")
+            self.assertNotIn("City." + city.id,
+                             FileStorage._FileStorage__objects)
+            self.assertEqual(storage.count(City), 1)
+            self.assertEqual(len(storage.all()), 2)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__sharded = False
+            for name in classes:
+                if os.path.exists("file_sharded.json." + name):
+                    os.remove("file_sharded.json." + name)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_sharded_close_drops_deleted_keys(self):
+        """Test that a shard rewritten by another process drops the keys
+        it deleted"""
+        script = ("from models import storage\n"
+                  "from models.state import State\n"
+                  "import sys\n"
+                  "storage.delete(storage.get(State, sys.argv[1]))\n"
+                  "storage.save()\n")
+        env = dict(os.environ, HBNB_FILE_SHARDED="1", PYTHONPATH=ROOT)
+        env.pop("HBNB_TYPE_STORAGE", None)
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__sharded = True
+        with tempfile.TemporaryDirectory() as tmp:
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            try:
+                kept, deleted = State(name="X"), State(name="Y")
+                for obj in [kept, deleted]:
+                    storage.new(obj)
+                storage.save()
+                storage.close()
+                self.assertEqual(subprocess.call(
+                    [sys.executable, "-c", script, deleted.id], cwd=tmp,
+                    env=env), 0)
+                storage.close()
+                self.assertIsNone(storage.get(State, deleted.id))
+                self.assertEqual(storage.count(State), 1)
+                storage.new(State(name="Z"))
+                storage.save()
+                FileStorage._FileStorage__objects = {}
+                storage.reload()
+                names = sorted(s.name for s in storage.all(State).values())
+                self.assertEqual(names, ["X", "Z"])
+            finally:
+                FileStorage._FileStorage__objects = save
+                FileStorage._FileStorage__file_path = "file.json"
+                FileStorage._FileStorage__sharded = False
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_write_behind(self):
+        """Test that write-behind saves are coalesced by the flusher"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_behind.json"
+        FileStorage._FileStorage__flush_interval = 0.5
+        try:
+            FileStorage._FileStorage__write_behind = "relaxed"
+            states = [State(name=str(i)) for i in range(20)]
+            for state in states:
+                storage.new(state)
+                storage.save()
+            self.assertFalse(os.path.exists("file_behind.json"))
+            FileStorage._FileStorage__write_behind = "strict"
+            storage.save()
+            self.assertEqual(FileStorage._FileStorage__flushed,
+                             FileStorage._FileStorage__requested)
+            with open("file_behind.json", "r") as f:
+                self.assertEqual(len(json.load(f)), 20)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__write_behind = None
+            FileStorage._FileStorage__flush_interval = 0.1
+            if os.path.exists("file_behind.json"):
+                os.remove("file_behind.json")
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_write_behind_failure(self):
+        """Test that a strict save raises the error of a failed flush"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__file_path = "file_behind.json"
+        FileStorage._FileStorage__write_behind = "strict"
+
+        def fail(self):
+            """fails like a full disk"""
+            raise OSError("disk full")
+        try:
+            storage.new(State(name="California"))
+            with mock.patch.object(FileStorage, "_FileStorage__flush", fail):
+                with self.assertRaises(OSError):
+                    storage.save()
+            self.assertFalse(os.path.exists("file_behind.json"))
+            self.assertLess(FileStorage._FileStorage__flushed,
+                            FileStorage._FileStorage__requested)
+            # the next save writes the changes the failed one left
+            storage.save()
+            with open("file_behind.json", "r") as f:
+                self.assertEqual(len(json.load(f)), 1)
+        finally:
+            FileStorage._FileStorage__objects = save
+            FileStorage._FileStorage__file_path = "file.json"
+            FileStorage._FileStorage__write_behind = None
+            if os.path.exists("file_behind.json"):
+                os.remove("file_behind.json")
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_save_is_atomic(self):
+        """Test that a failed save leaves the previous file untouched"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            storage.new(State(name="California"))
+            storage.save()
+            with open("file.json", "r") as f:
+                before = f.read()
+            storage.new(State(name="Nevada"))
+
+            def crash(entries, f, encoded=False):
+                """writes half an entry, then fails"""
+                f.write('{"State.')
+                raise OSError("disk full")
+            with mock.patch.object(file_storage.json_stream, "dump", crash):
+                with self.assertRaises(OSError):
+                    storage.save()
+            with open("file.json", "r") as f:
+                self.assertEqual(f.read(), before)
+            self.assertEqual([name for name in os.listdir(".")
+                              if name.endswith(".tmp")], [])
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_reload_corrupt_file(self):
+        """Test that a corrupt file is reported and left untouched, and an
+        empty one loads nothing"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            storage.new(State(name="California"))
+            storage.save()
+            with open("file.json", "r") as f:
+                truncated = f.read()[:-10]
+            with open("file.json", "w") as f:
+                f.write(truncated)
+            FileStorage._FileStorage__objects = {}
+            with self.assertRaises(ValueError):
+                storage.reload()
+            with open("file.json", "r") as f:
+                self.assertEqual(f.read(), truncated)
+            open("file.json", "w").close()
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual(storage.count(), 0)
+        finally:
+            FileStorage._FileStorage__objects = save
+            if os.path.exists("file.json"):
+                os.remove("file.json")
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_all_while_writing(self):
+        """Test that all() can be iterated while other threads add objects"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        done = threading.Event()
+        errors = []
+
+        def writer():
+            """adds States until the reader is done"""
+            while not done.is_set():
+                storage.new(State())
+
+        def reader():
+            """iterates every object many times"""
+            try:
+                for _ in range(200):
+                    for key, obj in storage.all().items():
+                        pass
+            except Exception as e:
+                errors.append(e)
+            done.set()
+        try:
+            threads = [threading.Thread(target=writer) for _ in range(2)]
+            threads.append(threading.Thread(target=reader))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+        finally:
+            done.set()
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_group_commit(self):
+        """Test that concurrent saves share writes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        flush = FileStorage._FileStorage__flush
+        writes = []
+
+        def slow_flush(self):
+            """counts the writes and makes them overlap"""
+            writes.append(1)
+            time.sleep(0.05)
+            flush(self)
+
+        def saver():
+            """adds a State and saves it"""
+            storage.new(State())
+            storage.save()
+        try:
+            with mock.patch.object(FileStorage, "_FileStorage__flush",
+                                   slow_flush):
+                threads = [threading.Thread(target=saver) for i in range(10)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertLess(len(writes), 10)
+            with open("file.json", "r") as f:
+                self.assertEqual(len(json.load(f)), 10)
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    def run_worker(self, directory, names):
+        """saves a State per name from a process sharing directory"""
+        script = ("from models.state import State\n"
+                  "import sys\n"
+                  "for name in sys.argv[1:]:\n"
+                  "    State(name=name).save()\n")
+        env = dict(os.environ, HBNB_FILE_MULTIPROCESS="1", PYTHONPATH=ROOT)
+        env.pop("HBNB_TYPE_STORAGE", None)
+        return subprocess.Popen([sys.executable, "-c", script] + names,
+                                cwd=directory, env=env)
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_multiprocess_saves(self):
+        """Test that processes sharing the files do not lose writes"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        with tempfile.TemporaryDirectory() as tmp:
+            workers = [self.run_worker(tmp, [str(i) for i in range(15)])
+                       for _ in range(4)]
+            for worker in workers:
+                self.assertEqual(worker.wait(), 0)
+            FileStorage._FileStorage__objects = {}
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            FileStorage._FileStorage__journal = True
+            try:
+                storage.reload()
+                self.assertEqual(storage.count(State), 60)
+            finally:
+                FileStorage._FileStorage__objects = save
+                FileStorage._FileStorage__file_path = "file.json"
+                FileStorage._FileStorage__journal = False
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_multiprocess_close_merges_changed_keys(self):
+        """Test that a stale process merges only the keys others changed"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__multiprocess = True
+        FileStorage._FileStorage__journal = True
+        with tempfile.TemporaryDirectory() as tmp:
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            try:
+                kept = State(name="California")
+                storage.new(kept)
+                storage.save()
+                storage.close()
+                self.assertEqual(self.run_worker(tmp, ["Nevada"]).wait(), 0)
+                storage.close()
+                self.assertIs(storage.get(State, kept.id), kept)
+                names = sorted(s.name for s in storage.all(State).values())
+                self.assertEqual(names, ["California", "Nevada"])
+                other = State(name="Oregon")
+                storage.new(other)
+                storage.save()
+                FileStorage._FileStorage__objects = {}
+                storage.reload()
+                self.assertEqual(storage.count(State), 3)
+            finally:
+                FileStorage._FileStorage__objects = save
+                FileStorage._FileStorage__file_path = "file.json"
+                FileStorage._FileStorage__multiprocess = False
+                FileStorage._FileStorage__journal = False
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_multiprocess_close_drops_compacted_deletes(self):
+        """Test that a full reload drops what another process deleted"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__multiprocess = True
+        FileStorage._FileStorage__journal = True
+        script = ("from models import storage\n"
+                  "from models.state import State\n"
+                  "import sys\n"
+                  "storage.delete(storage.get(State, sys.argv[1]))\n"
+                  "storage.save()\n"
+                  "for i in range(5):\n"
+                  "    State(name=str(i)).save()\n")
+        env = dict(os.environ, HBNB_FILE_MULTIPROCESS="1", PYTHONPATH=ROOT,
+                   HBNB_JOURNAL_MAX_ENTRIES="3")
+        env.pop("HBNB_TYPE_STORAGE", None)
+        with tempfile.TemporaryDirectory() as tmp:
+            FileStorage._FileStorage__file_path = os.path.join(tmp,
+                                                               "file.json")
+            try:
+                deleted = State(name="California")
+                for obj in [deleted, State(name="Nevada")]:
+                    storage.new(obj)
+                storage.save()
+                storage.close()
+                worker = subprocess.Popen(
+                    [sys.executable, "-c", script, deleted.id], cwd=tmp,
+                    env=env)
+                self.assertEqual(worker.wait(), 0)
+                self.assertFalse(os.path.exists(os.path.join(
+                    tmp, "file.json.journal.1")))
+                storage.close()
+                self.assertIsNone(storage.get(State, deleted.id))
+                self.assertEqual(storage.count(State), 6)
+                storage.new(State(name="Oregon"))
+                storage.save()
+                FileStorage._FileStorage__objects = {}
+                storage.reload()
+                self.assertIsNone(storage.get(State, deleted.id))
+                self.assertEqual(storage.count(State), 7)
+            finally:
+                FileStorage._FileStorage__objects = save
+                FileStorage._FileStorage__file_path = "file.json"
+                FileStorage._FileStorage__multiprocess = False
+                FileStorage._FileStorage__journal = False
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_reload_builds_lazily(self):
+        """Test that reload keeps raw dictionaries until objects are used"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            states = [State(name=str(i)) for i in range(3)]
+            city = City(name="Reno", state_id=states[0].id)
+            for obj in states + [city]:
+                storage.new(obj)
+            storage.save()
+            with open("file.json", "r") as f:
+                before = json.load(f)
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            objects = FileStorage._FileStorage__objects
+            self.assertEqual(len(objects), 0)
+            self.assertEqual(storage.count(), 4)
+            self.assertEqual(storage.count(State), 3)
+            self.assertEqual(storage.get(State, states[1].id).name, "1")
+            self.assertEqual(list(objects), ["State." + states[1].id])
+            cities = storage.related(City, "state_id", states[0].id)
+            self.assertEqual([c.id for c in cities], [city.id])
+            self.assertEqual(len(objects), 2)
+            # untouched objects are written back as they were read
+            storage.save()
+            with open("file.json", "r") as f:
+                self.assertEqual(json.load(f), before)
+            self.assertEqual(len(storage.all(State)), 3)
+            self.assertEqual(len(storage.all()), 4)
+        finally:
+            FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(not isinstance(models.storage, FileStorage),
+                     "not testing file storage")
+    def test_place_ids(self):
+        """Test range filters over places with and without the columns"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        try:
+            places = [Place(name=str(i), price_by_night=i * 50,
+                            max_guest=i) for i in range(5)]
+            for place in places:
+                storage.new(place)
+            storage.save()
+            for columns in [None, file_storage.place_columns.PlaceColumns()]:
+                with self.subTest(columns=columns):
+                    FileStorage._FileStorage__columns = columns
+                    FileStorage._FileStorage__objects = {}
+                    FileStorage._FileStorage__dirty.clear()
+                    storage.reload()
+                    self.assertEqual(
+                        sorted(storage.place_ids(price_by_night=(50, 150))),
+                        sorted(p.id for p in places[1:4]))
+                    place = storage.get(Place, places[2].id)
+                    place.price_by_night = 1000
+                    storage.delete(storage.get(Place, places[1].id))
+                    self.assertEqual(
+                        storage.place_ids(price_by_night=(50, 150),
+                                          max_guest=(2, None)),
+                        [places[3].id])
+        finally:
+            FileStorage._FileStorage__columns = None
+            FileStorage._FileStorage__objects = save
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""Contains the TestJsonCodecDocs and TestJsonCodec classes"""
+from datetime import datetime
+import inspect
+from models.engine import json_codec
+import pep8
+import unittest
+
+
+class TestJsonCodecDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_codec"""
+    def test_pep8_conformance_json_codec(self):
+        """Test that models/engine/json_codec.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_codec.py',
+                                    'tests/test_models/test_engine/\
+test_json_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_codec_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(json_codec.__doc__) >= 1)
+        for name, func in inspect.getmembers(json_codec, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestJsonCodec(unittest.TestCase):
+    """Test every JSON codec installed"""
+    def setUp(self):
+        """remembers the codec in use"""
+        self.name = json_codec.name
+
+    def tearDown(self):
+        """restores the codec in use"""
+        json_codec.use(self.name)
+
+    def test_round_trip(self):
+        """Test that every codec encodes and decodes the same values"""
+        value = {"name": "Calïf / \"x\"", "ids": [1, 2.5, None, True],
+                 "nested": {"n": -12345678901}}
+        when = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        for name in json_codec.available():
+            with self.subTest(codec=name):
+                json_codec.use(name)
+                self.assertEqual(json_codec.name, name)
+                text = json_codec.dumps(value)
+                self.assertIsInstance(text, str)
+                self.assertEqual(json_codec.loads(text), value)
+                self.assertEqual(json_codec.loads(text.encode()), value)
+                self.assertEqual(json_codec.loads(json_codec.dumps([when])),
+                                 [when.isoformat()])
+                with self.assertRaises(ValueError):
+                    json_codec.loads('{"a": ')
+
+    def test_big_integers(self):
+        """Test that every codec keeps integers beyond 64 bits exact"""
+        value = {"big": 1 << 64, "small": -(1 << 63) - 1, "id": "1" * 20,
+                 "float": 0.5}
+        for name in json_codec.available():
+            with self.subTest(codec=name):
+                json_codec.use(name)
+                text = json_codec.dumps(value)
+                self.assertEqual(json_codec.loads(text), value)
+                self.assertEqual(json_codec.loads(text.encode()), value)
+                self.assertIs(type(json_codec.loads(text)["big"]), int)
+
+    def test_use(self):
+        """Test that the standard library is always available and unknown
+        codecs are refused"""
+        self.assertIn("json", json_codec.available())
+        json_codec.use()
+        self.assertEqual(json_codec.name, json_codec.available()[0])
+        with self.assertRaises(ValueError):
+            json_codec.use("pickle")
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""Contains the TestJsonStreamDocs and TestJsonStream classes"""
+import io
+import inspect
+import json
+from models.engine import json_stream
+import pep8
+import unittest
+
+
+class TestJsonStreamDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_stream"""
+    def test_pep8_conformance_json_stream(self):
+        """Test that models/engine/json_stream.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_stream.py',
+                                    'tests/test_models/test_engine/\
+test_json_stream.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_stream_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(json_stream.__doc__) >= 1)
+        for name, func in inspect.getmembers(json_stream,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestJsonStream(unittest.TestCase):
+    """Test the streaming JSON reader and writer"""
+    def test_iterload_small_chunks(self):
+        """Test that entries split across chunks decode correctly"""
+        objs = {"State.1": {"name": "Calïf", "ids": [1, 2.5, None]},
+                "City.2": {"name": "} ,: {", "n": 12345678901234}}
+        text = json.dumps(objs, indent=2)
+        for size in [1, 2, 5, 1 << 16]:
+            with self.subTest(size=size):
+                entries = json_stream.iterload(io.StringIO(text), size)
+                self.assertEqual(dict(entries), objs)
+
+    def test_iterload_empty_and_truncated(self):
+        """Test empty objects and errors on truncated documents"""
+        self.assertEqual(list(json_stream.iterload(io.StringIO(" {} "))), [])
+        for text in ['', '{"a": {}', '{"a": {}, ', '[]']:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    list(json_stream.iterload(io.StringIO(text), 2))
+
+    def test_dump(self):
+        """Test that dump writes a document json can read back"""
+        objs = {"State.1": {"name": "a"}, "City.2": {"name": "b"}}
+        f = io.StringIO()
+        json_stream.dump(objs.items(), f)
+        self.assertEqual(json.loads(f.getvalue()), objs)
+        self.assertEqual(len(f.getvalue().splitlines()), 4)
+
+    def test_iterload_lines(self):
+        """Test that documents with an entry per line decode, entries
+        spread over several lines or sharing one included"""
+        objs = {"State.{}".format(i): {"name": "}\n{", "i": i}
+                for i in range(20)}
+        f = io.StringIO()
+        json_stream.dump(objs.items(), f)
+        texts = [f.getvalue(), json.dumps(objs, indent=4),
+                 "{\n" + json.dumps(objs)[1:],
+                 "{\n" + json.dumps(objs)[1:-1] + "\n \n}"]
+        for text in texts:
+            for size in [2, 7, 1 << 16]:
+                with self.subTest(text=text[:20], size=size):
+                    entries = json_stream.iterload(io.StringIO(text), size)
+                    self.assertEqual(dict(entries), objs)
+        with self.assertRaises(json.JSONDecodeError):
+            list(json_stream.iterload(io.StringIO(texts[0][:-4]), 2))
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""Contains the TestMigrationsDocs and TestMigrations classes"""
+import inspect
+import models
+from models.engine import migrations
+import os
+import pep8
+import sqlalchemy
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table
+import unittest
+
+
+class TestMigrationsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of migrations"""
+    def test_pep8_conformance_migrations(self):
+        """Test that models/engine/migrations.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/migrations.py',
+                                    'tests/test_models/test_engine/\
+test_migrations.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_migrations_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(migrations.__doc__) >= 1)
+        for name, func in inspect.getmembers(migrations, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestMigrations(unittest.TestCase):
+    """Test the migrations on SQLite databases"""
+    def setUp(self):
+        """creates an empty in-memory database"""
+        self.engine = sqlalchemy.create_engine("sqlite://")
+
+    def tearDown(self):
+        """closes the database"""
+        self.engine.dispose()
+
+    def test_create_index_add_column(self):
+        """Test that the helpers only change what is missing"""
+        old = MetaData()
+        Table("things", old, Column("id", Integer, primary_key=True))
+        old.create_all(self.engine)
+        new = MetaData()
+        Table("things", new, Column("id", Integer, primary_key=True),
+              Column("name", String(16), nullable=True),
+              Index("ix_things_name", "name"))
+        for _ in range(2):
+            with self.engine.begin() as conn:
+                migrations.add_column(conn, new.tables, "things", "name")
+                migrations.create_index(conn, new.tables, "things",
+                                        "ix_things_name")
+        inspector = sqlalchemy.inspect(self.engine)
+        self.assertEqual([c["name"] for c in inspector.get_columns("things")],
+                         ["id", "name"])
+        self.assertEqual([i["name"] for i in inspector.get_indexes("things")],
+                         ["ix_things_name"])
+        with self.engine.begin() as conn:
+            with self.assertRaises(ValueError):
+                migrations.create_index(conn, new.tables, "things", "nope")
+
+    def test_unique_user_email_refuses_duplicates(self):
+        """Test that users sharing an email stop the migration, unchanged"""
+        meta = MetaData()
+        users = Table("users", meta, Column("id", Integer, primary_key=True),
+                      Column("email", String(128)),
+                      Index("ux_users_email", "email", unique=True))
+        Table("users", MetaData(), Column("id", Integer, primary_key=True),
+              Column("email", String(128))).create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(users.insert(), [{"email": "a@b.c"},
+                                          {"email": "a@b.c"},
+                                          {"email": "d@e.f"}])
+        with self.engine.begin() as conn:
+            with self.assertRaisesRegex(ValueError, "a@b.c"):
+                migrations.unique_user_email(conn, meta.tables)
+        with self.engine.begin() as conn:
+            conn.execute(users.delete().where(users.c.id == 2))
+            migrations.unique_user_email(conn, meta.tables)
+        indexes = sqlalchemy.inspect(self.engine).get_indexes("users")
+        self.assertEqual([i["name"] for i in indexes], ["ux_users_email"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migrate(self):
+        """Test that tables made without indexes are brought up to date,
+        once"""
+        from models.base_model import Base
+        old = MetaData()
+        for table in Base.metadata.tables.values():
+            table.to_metadata(old).indexes.clear()
+        old.create_all(self.engine)
+        self.assertEqual(migrations.migrate(self.engine, Base.metadata.tables),
+                         len(migrations.MIGRATIONS))
+        inspector = sqlalchemy.inspect(self.engine)
+        places = {i["name"]: i for i in inspector.get_indexes("places")}
+        self.assertEqual(places["ix_places_city_id_price_by_night"]
+                         ["column_names"], ["city_id", "price_by_night"])
+        users = {i["name"]: i for i in inspector.get_indexes("users")}
+        self.assertTrue(users["ux_users_email"]["unique"])
+        self.assertEqual(migrations.migrate(self.engine, Base.metadata.tables),
+                         len(migrations.MIGRATIONS))
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(sqlalchemy.select(
+                migrations.schema_version)).all(), [(3,)])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_no_foreign_key_indexes_on_mysql(self):
+        """Test that the foreign keys are indexed on SQLite only"""
+        from models.base_model import Base
+        migrations.skip_foreign_key_indexes(Base.metadata.tables)
+        statements = []
+        mysql = sqlalchemy.create_mock_engine(
+            "mysql://", lambda sql, *args, **kwargs: statements.append(
+                str(sql.compile(dialect=mysql.dialect))))
+        Base.metadata.create_all(mysql, checkfirst=False)
+        indexes = [s.split("INDEX ")[1].split()[0] for s in statements
+                   if "INDEX " in s]
+        self.assertEqual(sorted(indexes),
+                         ["ix_places_city_id_price_by_night",
+                          "ux_users_email"])
+        Base.metadata.create_all(self.engine)
+        inspector = sqlalchemy.inspect(self.engine)
+        cities = [i["name"] for i in inspector.get_indexes("cities")]
+        self.assertEqual(cities, ["ix_cities_state_id"])
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""Contains the TestPlaceColumnsDocs and TestPlaceColumns classes"""
+import inspect
+from models.engine import place_columns
+import pep8
+import unittest
+from unittest import mock
+PlaceColumns = place_columns.PlaceColumns
+
+
+class TestPlaceColumnsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of PlaceColumns"""
+    def test_pep8_conformance_place_columns(self):
+        """Test that models/engine/place_columns.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/place_columns.py',
+                                    'tests/test_models/test_engine/\
+test_place_columns.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_place_columns_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(place_columns.__doc__) >= 1)
+        self.assertTrue(len(PlaceColumns.__doc__) >= 1)
+        for name, func in inspect.getmembers(PlaceColumns,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestPlaceColumns(unittest.TestCase):
+    """Test the columnar store, with NumPy if installed and without"""
+    def check_store(self):
+        """fills a store and checks range selections on it"""
+        columns = PlaceColumns()
+        places = {str(i): {"price_by_night": i * 10, "max_guest": i % 4,
+                           "latitude": 30.0 + i}
+                  for i in range(3000)}
+        for pid, attrs in places.items():
+            columns.set(pid, attrs.get)
+        columns.set("bad", {"price_by_night": "n/a"}.get)
+        self.assertEqual(len(columns), 3001)
+        self.assertEqual(sorted(columns.select(price_by_night=(100, 130))),
+                         ["10", "11", "12", "13"])
+        self.assertEqual(
+            sorted(columns.select(price_by_night=(None, 100),
+                                  max_guest=(3, 3))), ["3", "7"])
+        self.assertEqual(len(columns.select(latitude=(3020.5, None))), 9)
+        columns.remove("11")
+        columns.remove("missing")
+        columns.set("12", {"price_by_night": 500}.get)
+        self.assertEqual(sorted(columns.select(price_by_night=(100, 130))),
+                         ["10", "13"])
+        self.assertEqual(len(columns.select()), 3000)
+        with self.assertRaises(ValueError):
+            columns.select(name=(0, 1))
+        columns.clear()
+        self.assertEqual(columns.select(), [])
+
+    @unittest.skipIf(place_columns.numpy is None, "NumPy is not installed")
+    def test_numpy_columns(self):
+        """Test the store on NumPy arrays"""
+        self.check_store()
+
+    def test_array_columns(self):
+        """Test the store on stdlib arrays"""
+        with mock.patch.object(place_columns, "numpy", None):
+            self.check_store()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Contains the TestReplicasDocs and TestReplicaRouter classes"""
+import inspect
+from models.engine import replicas
+import os
+import pep8
+import sqlalchemy
+import tempfile
+import unittest
+
+
+class TestReplicasDocs(unittest.TestCase):
+    """Tests to check the documentation and style of replicas"""
+    def test_pep8_conformance_replicas(self):
+        """Test that models/engine/replicas.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/replicas.py',
+                                    'tests/test_models/test_engine/\
+test_replicas.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_replicas_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(replicas.__doc__) >= 1)
+        for cls in [replicas.ReplicaRouter, replicas.RoutingSession]:
+            self.assertTrue(len(cls.__doc__) >= 1)
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                if func.__qualname__.startswith(cls.__name__):
+                    self.assertTrue(len(func.__doc__) >= 1,
+                                    "{:s} needs a docstring".format(name))
+
+
+class TestReplicaRouter(unittest.TestCase):
+    """Test the round robin and health checks of ReplicaRouter"""
+    def setUp(self):
+        """creates two healthy replicas and a missing one"""
+        self.tmp = tempfile.TemporaryDirectory()
+        paths = [os.path.join(self.tmp.name, name)
+                 for name in ["a.db", "missing/b.db", "c.db"]]
+        for path in paths[::2]:
+            # an empty file is an empty SQLite database
+            open(path, "a").close()
+        self.engines = [sqlalchemy.create_engine(
+            "sqlite:///file:{}?mode=ro&uri=true".format(path))
+            for path in paths]
+
+    def tearDown(self):
+        """closes the replicas"""
+        for engine in self.engines:
+            engine.dispose()
+        self.tmp.cleanup()
+
+    def test_pick(self):
+        """Test that healthy replicas are handed out in turn"""
+        router = replicas.ReplicaRouter(self.engines, interval=60)
+        picked = [router.pick() for _ in range(4)]
+        self.assertEqual(picked, [self.engines[0], self.engines[2]] * 2)
+        self.assertEqual([r["healthy"] for r in router.status()],
+                         [True, False, True])
+        self.assertIsNone(replicas.ReplicaRouter(self.engines[1:2]).pick())
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""Contains the TestReadWriteLockDocs and TestReadWriteLock classes"""
+import inspect
+from models.engine import rwlock
+from models.engine.rwlock import ReadWriteLock
+import pep8
+import threading
+import time
+import unittest
+
+
+class TestReadWriteLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of ReadWriteLock"""
+    def test_pep8_conformance_rwlock(self):
+        """Test that models/engine/rwlock.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/rwlock.py',
+                                    'tests/test_models/test_engine/\
+test_rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_rwlock_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(rwlock.__doc__) >= 1)
+        self.assertTrue(len(ReadWriteLock.__doc__) >= 1)
+        for name, func in inspect.getmembers(ReadWriteLock,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test the reader-writer lock"""
+    def run_thread(self, target):
+        """runs target in a thread and returns it once started"""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_share(self):
+        """Test that a reader does not wait for another reader"""
+        lock = ReadWriteLock()
+        entered = threading.Event()
+
+        def reader():
+            with lock.read():
+                entered.set()
+        with lock.read():
+            self.run_thread(reader)
+            self.assertTrue(entered.wait(5))
+
+    def test_writer_excludes(self):
+        """Test that readers and writers wait for a writer"""
+        lock = ReadWriteLock()
+        events = []
+
+        def reader():
+            with lock.read():
+                events.append("read")
+
+        def writer():
+            with lock.write():
+                events.append("write")
+        with lock.write():
+            threads = [self.run_thread(reader), self.run_thread(writer)]
+            time.sleep(0.1)
+            self.assertEqual(events, [])
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(sorted(events), ["read", "write"])
+
+    def test_waiting_writer_goes_first(self):
+        """Test that a waiting writer keeps new readers out"""
+        lock = ReadWriteLock()
+        events = []
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        def reader():
+            with lock.read():
+                events.append("read")
+        with lock.read():
+            w = self.run_thread(writer)
+            time.sleep(0.1)
+            r = self.run_thread(reader)
+            time.sleep(0.1)
+            self.assertEqual(events, [])
+        w.join(5)
+        r.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """Test nested holds of both sides and the upgrade error"""
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            with lock.read():
+                with self.assertRaises(RuntimeError):
+                    lock.acquire_write()
+        # the lock is free again once every hold is released
+        with lock.write():
+            pass
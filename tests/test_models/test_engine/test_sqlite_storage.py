@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes"""
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.city import City
+from models.state import State
+import os
+import pep8
+import sqlalchemy
+import tempfile
+import unittest
+from unittest import mock
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py',
+                                    'tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1)
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1)
+        for name, func in inspect.getmembers(SQLiteStorage,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") != "sqlite",
+                 "not testing sqlite storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    def setUp(self):
+        """opens a storage on a new database file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "hbnb.db")
+        with mock.patch.dict(os.environ, {"HBNB_SQLITE_DB": path}):
+            self.storage = SQLiteStorage()
+        self.storage.reload()
+        self.engine = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """closes the storage and removes its database"""
+        self.storage.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_pragmas(self):
+        """Test that connections use WAL and enforce foreign keys"""
+        with self.engine.connect() as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            fks = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        self.assertEqual(mode, "wal")
+        self.assertEqual(fks, 1)
+
+    def test_foreign_key_indexes(self):
+        """Test that the foreign key columns are indexed"""
+        inspector = sqlalchemy.inspect(self.engine)
+        for table, column in [("cities", "state_id"), ("places", "city_id"),
+                              ("places", "user_id"), ("reviews", "place_id"),
+                              ("reviews", "user_id"),
+                              ("place_amenity", "amenity_id")]:
+            with self.subTest(table=table):
+                indexed = [index["column_names"]
+                           for index in inspector.get_indexes(table)]
+                self.assertIn([column], indexed)
+
+    def test_new_save_get_count_delete(self):
+        """Test the storage interface on the SQLite database"""
+        state = State(name="California")
+        city = City(name="San Francisco", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name,
+                         "California")
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertIn("City." + city.id, self.storage.all(City))
+        self.storage.delete(self.storage.get(City, city.id))
+        self.storage.save()
+        self.assertIsNone(self.storage.get(City, city.id))
+
+    def test_foreign_keys_enforced(self):
+        """Test that a City needs an existing State"""
+        self.storage.new(City(name="Nowhere", state_id="missing"))
+        with self.assertRaises(sqlalchemy.exc.IntegrityError):
+            self.storage.save()
+
+    def test_pool_stats(self):
+        """Test that the statistics follow the connections checked out"""
+        with self.engine.connect():
+            stats = self.storage.pool_stats()
+            self.assertEqual(stats["pool"], "TimedQueuePool")
+            self.assertEqual(stats["checked_out"], 1)
+        self.assertEqual(self.storage.pool_stats()["checked_out"], 0)
+
+    def test_all_counts_stream(self):
+        """Test the single query reads against the per class ones"""
+        state = State(name="California")
+        city = City(name="San Francisco", state_id=state.id)
+        self.storage.new(state)
+        self.storage.new(city)
+        self.storage.save()
+        self.storage.close()
+        loaded = self.storage.get(State, state.id)
+        objs = self.storage.all()
+        self.assertEqual(set(objs), {"State." + state.id, "City." + city.id})
+        self.assertIs(objs["State." + state.id], loaded)
+        self.assertEqual(objs["City." + city.id].to_dict(), city.to_dict())
+        self.assertEqual(objs["City." + city.id].state.name, "California")
+        self.assertEqual(self.storage.counts(),
+                         {"Amenity": 0, "City": 1, "Place": 0, "Review": 0,
+                          "State": 1, "User": 0})
+        self.assertEqual(self.storage.counts([City, "Nowhere"]),
+                         {"City": 1, "Nowhere": 0})
+        self.assertEqual(self.storage.count(), 2)
+        streamed = dict(self.storage.stream(yield_per=1))
+        self.assertEqual(streamed, objs)
+        self.assertEqual(list(self.storage.stream(City)),
+                         [("City." + city.id, objs["City." + city.id])])
+
+    def test_search_places(self):
+        """Test that a search runs one query, whatever it matches"""
+        from api.v1.app import app
+        from models.amenity import Amenity
+        from models.place import Place
+        from models.user import User
+        user = User(email="a@b.c", password="pwd")
+        wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+        california, nevada = State(name="California"), State(name="Nevada")
+        cities = [City(name="SF", state_id=california.id),
+                  City(name="LA", state_id=california.id),
+                  City(name="Reno", state_id=nevada.id)]
+        places = [Place(name=str(i), city_id=city.id, user_id=user.id)
+                  for i, city in enumerate(cities * 2)]
+        places[0].amenities = [wifi, pool]
+        places[1].amenities = [wifi]
+        places[2].amenities = [wifi, pool]
+        for obj in [user, wifi, pool, california, nevada] + cities + places:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        statements = []
+        sqlalchemy.event.listen(self.engine, "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+
+        def search(**body):
+            """returns the names of the places found through the API"""
+            with mock.patch("api.v1.views.places.storage", self.storage):
+                res = app.test_client().post("/api/v1/places_search",
+                                             json=body)
+            self.assertEqual(res.status_code, 200)
+            return [place["name"] for place in res.get_json()]
+        self.assertEqual(search(), ["0", "1", "2", "3", "4", "5"])
+        self.assertEqual(search(states=[california.id],
+                                cities=[cities[0].id]),
+                         ["0", "1", "3", "4"])
+        self.assertEqual(search(amenities=[wifi.id, pool.id]), ["0", "2"])
+        self.assertEqual(search(states=[california.id],
+                                amenities=[wifi.id]), ["0", "1"])
+        self.assertEqual(search(offset=1, limit=2), ["1", "2"])
+        self.assertEqual(len(statements), 5)
+
+    def test_load(self):
+        """Test that the list endpoints load their relationships up front,
+        so that no lazy load happens even when lazy loads raise"""
+        from api.v1.app import app
+        from models.amenity import Amenity
+        from models.place import Place
+        from models.review import Review
+        from models.user import User
+        user = User(email="a@b.c", password="pwd")
+        state = State(name="California")
+        cities = [City(name=str(i), state_id=state.id) for i in range(3)]
+        places = [Place(name=str(i), city_id=cities[0].id, user_id=user.id)
+                  for i in range(3)]
+        reviews = [Review(text=str(i), place_id=places[0].id,
+                          user_id=user.id) for i in range(3)]
+        places[0].amenities = [Amenity(name=str(i)) for i in range(3)]
+        for obj in [user, state] + cities + places + reviews:
+            self.storage.new(obj)
+        self.storage.save()
+        self.storage.close()
+        statements = []
+        sqlalchemy.event.listen(self.engine, "before_cursor_execute",
+                                lambda *args: statements.append(args[2]))
+        urls = ["/api/v1/states/{}/cities".format(state.id),
+                "/api/v1/cities/{}/places".format(cities[0].id),
+                "/api/v1/places/{}/reviews".format(places[0].id),
+                "/api/v1/places/{}/amenities".format(places[0].id)]
+        views = ["cities", "places", "places_reviews", "places_amenities"]
+        patches = [mock.patch("api.v1.views.{}.storage".format(view),
+                              self.storage) for view in views]
+        patches.append(mock.patch.object(SQLiteStorage,
+                                         "_DBStorage__raiseload", True))
+        for patch in patches:
+            patch.start()
+        try:
+            for url in urls:
+                with self.subTest(url=url):
+                    del statements[:]
+                    res = app.test_client().get(url)
+                    self.assertEqual(res.status_code, 200)
+                    self.assertEqual(len(res.get_json()), 3)
+                    self.assertEqual(len(statements), 2)
+            state = self.storage.get(State, state.id)
+            with self.assertRaises(sqlalchemy.exc.InvalidRequestError):
+                state.cities
+            self.storage.close()
+            state = self.storage.get(State, state.id, {"cities": "joined"})
+            self.assertEqual(len(state.cities), 3)
+        finally:
+            for patch in patches:
+                patch.stop()
+
+    def test_replicas(self):
+        """Test that reads go to a healthy replica until the session
+        writes, and to the primary afterwards"""
+        import sqlite3
+        state = State(name="Replicated")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        self.engine.dispose()
+        replica = os.path.join(self.tmp.name, "replica.db")
+        with sqlite3.connect(os.path.join(self.tmp.name, "hbnb.db")) as src:
+            with sqlite3.connect(replica) as dst:
+                src.backup(dst)
+        fresh = State(name="Fresh")
+        self.storage.new(fresh)
+        self.storage.save()
+        self.storage.close()
+        env = {"HBNB_SQLITE_DB": os.path.join(self.tmp.name, "hbnb.db"),
+               "HBNB_SQLITE_REPLICAS": "{},{}".format(
+                   os.path.join(self.tmp.name, "missing", "r.db"), replica)}
+        with mock.patch.dict(os.environ, env):
+            storage = SQLiteStorage()
+        storage.reload()
+        try:
+            for _ in range(3):
+                self.assertEqual(storage.count(State), 1)
+                self.assertIsNone(storage.get(State, fresh.id))
+                storage.close()
+            mine = State(name="Mine")
+            storage.new(mine)
+            self.assertEqual(storage.count(State), 3)
+            storage.save()
+            self.assertEqual(storage.get(State, mine.id).name, "Mine")
+            storage.close()
+            self.assertEqual(storage.count(State), 1)
+            replicas = storage.pool_stats()["replicas"]
+            self.assertEqual([r["healthy"] for r in replicas], [False, True])
+        finally:
+            storage.close()
+            storage._DBStorage__router.dispose()
+            storage._DBStorage__engine.dispose()